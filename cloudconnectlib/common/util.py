@@ -52,6 +52,24 @@ def load_json_file(file_path):
         return json.load(file_pointer)
 
 
+def _escape_text(text):
+    # Same as ElementTree, only "&", "<" and ">" are escaped in text and the
+    # replacement is skipped if the character is absent.
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def _xml_element(tag, text):
+    if not text:
+        return f"<{tag} />"
+    return f"<{tag}>{_escape_text(text)}</{tag}>"
+
+
 def format_events(
     raw_events,
     time=None,
@@ -63,17 +81,56 @@ def format_events(
     unbroken=False,
     done=False,
 ):
-    return XMLEvent.format_events(
-        XMLEvent(
-            data,
-            time=time,
-            index=index,
-            host=host,
-            source=source,
-            sourcetype=sourcetype,
-            stanza=stanza,
-            unbroken=unbroken,
-            done=done,
-        )
-        for data in raw_events
+    """Format raw events as a Splunk XML stream. The output is the same as
+    solnlib `XMLEvent.format_events` but all events are written into a single
+    buffer with the header elements shared by all events.
+    :return: A `list` contains the formatted stream.
+    """
+    fields = (
+        ("index", index),
+        ("host", host),
+        ("source", source),
+        ("sourcetype", sourcetype),
     )
+    if (
+        stanza
+        or (done and not unbroken)
+        or any(value and not isinstance(value, str) for _, value in fields)
+    ):
+        return XMLEvent.format_events(
+            XMLEvent(
+                data,
+                time=time,
+                index=index,
+                host=host,
+                source=source,
+                sourcetype=sourcetype,
+                stanza=stanza,
+                unbroken=unbroken,
+                done=done,
+            )
+            for data in raw_events
+        )
+
+    header = [f'<event unbroken="{int(unbroken)}">' if unbroken else "<event>"]
+    if time:
+        header.append(_xml_element("time", "%.3f" % time))
+    header.extend(_xml_element(tag, value) for tag, value in fields if value)
+    header = "".join(header)
+    footer = "<done /></event>" if done else "</event>"
+
+    buffer = ["<stream>"]
+    for data in raw_events:
+        if not isinstance(data, str):
+            data = json.dumps(data)
+        buffer.append(header)
+        buffer.append(_xml_element("data", data))
+        buffer.append(footer)
+    if len(buffer) == 1:
+        return ["<stream />"]
+    buffer.append("</stream>")
+    stream = "".join(buffer)
+    if not stream.isascii():
+        # ElementTree writes characters which can't be encoded as references
+        stream = stream.encode("utf-8", "xmlcharrefreplace").decode("utf-8")
+    return [stream]
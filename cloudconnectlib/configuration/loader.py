@@ -24,7 +24,8 @@ from munch import munchify
 from ..common.log import get_cc_logger
 from ..common.util import is_true, is_valid_bool, is_valid_port, load_json_file
 from ..core.exceptions import ConfigException
-from ..core.ext import lookup_method
+from ..core.ext import lookup_method, precompile_arguments
+from ..core.http import RateLimit
 from ..core.models import (
     BasicAuthorization,
     Checkpoint,
@@ -133,6 +134,17 @@ class CloudConnectConfigLoaderV1(CloudConnectConfigLoader):
 
         return proxy
 
+    def _load_rate_limit(self, candidate, variables):
+        """
+        Render rate limit setting with given variables.
+        :param candidate: raw rate limit setting as `dict`
+        :param variables: variables to render template in rate limit setting.
+        :return: A `RateLimit` object or `None` if it's not set.
+        """
+        if not candidate:
+            return None
+        return RateLimit.from_setting(self._render_from_dict(candidate, variables))
+
     @staticmethod
     def _get_log_level(level_name):
         if level_name:
@@ -167,8 +179,11 @@ class CloudConnectConfigLoaderV1(CloudConnectConfigLoader):
         candidate = candidate or {}
         proxy_setting = self._load_proxy(candidate.get("proxy"), variables)
         log_setting = self._load_logging(candidate.get("logging"), variables)
+        rate_limit = self._load_rate_limit(candidate.get("rate_limit"), variables)
 
-        return munchify({"proxy": proxy_setting, "logging": log_setting})
+        return munchify(
+            {"proxy": proxy_setting, "logging": log_setting, "rate_limit": rate_limit}
+        )
 
     @staticmethod
     def _load_authorization(candidate):
@@ -202,14 +217,16 @@ class CloudConnectConfigLoaderV1(CloudConnectConfigLoader):
         tasks = []
         for item in raw_tasks:
             self._validate_method(item["method"])
-            tasks.append(Task(item["input"], item["method"], item.get("output")))
+            inputs = precompile_arguments(item["method"], item["input"])
+            tasks.append(Task(inputs, item["method"], item.get("output")))
         return tasks
 
     def _parse_conditions(self, raw_conditions):
         conditions = []
         for item in raw_conditions:
             self._validate_method(item["method"])
-            conditions.append(Condition(item["input"], item["method"]))
+            inputs = precompile_arguments(item["method"], item["input"])
+            conditions.append(Condition(inputs, item["method"]))
         return conditions
 
     @staticmethod
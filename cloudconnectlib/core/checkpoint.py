@@ -26,7 +26,7 @@ class CheckpointManagerAdapter(tacm.TACheckPointMgr):
     def __init__(self, namespaces, content, meta_config, task_config):
         super().__init__(meta_config, task_config)
         if isinstance(namespaces, (list, tuple)):
-            self.namespaces = (_Token(t) for t in namespaces)
+            self.namespaces = [_Token(t) for t in namespaces]
         else:
             self.namespaces = [_Token(namespaces)]
         self.content = DictToken(content)
@@ -48,3 +48,18 @@ class CheckpointManagerAdapter(tacm.TACheckPointMgr):
             logger.info("No existing checkpoint found")
             checkpoint = {}
         return checkpoint
+
+    def _validators_namespaces_for(self, ctx):
+        return self._namespaces_for(ctx) + ["validators"]
+
+    def save_validators(self, ctx, validators):
+        """Save cache validators of responses by url"""
+        namespaces = self._validators_namespaces_for(ctx)
+        if validators:
+            super().update_ckpt(ckpt=validators, namespaces=namespaces)
+        else:
+            super().delete_if_exists(namespaces)
+
+    def load_validators(self, ctx):
+        """Load cache validators of responses by url"""
+        return super().get_ckpt(self._validators_namespaces_for(ctx)) or {}
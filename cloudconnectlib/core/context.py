@@ -0,0 +1,154 @@
+#
+# Copyright 2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import copy
+import itertools
+from collections.abc import MutableMapping
+
+# Stamps are unique process wide, so equal stamps always mean the same value
+# no matter which context they come from.
+_stamps = itertools.count(1)
+
+# Marks a key deleted in a forked context while it's still in the parent.
+_deleted = object()
+
+# Values of these types inherited by a forked context are copied to isolate.
+_MUTABLE_TYPES = (dict, list, set, bytearray)
+
+
+class Context(MutableMapping):
+    """Context wraps a dict which contains variables to render templates.
+    All changes are written through to the wrapped dict, and every key is
+    stamped each time it's set so that a rendered value can be reused until
+    one of variables it depends on changes.
+
+    A context can be forked in O(1). The forked context shares all variables
+    with its parent and keeps its own changes in a new layer, so the parent
+    must not be changed once it's forked. Reading never copies, a dict, list
+    or set inherited from the parent is the same object for all forked
+    contexts, call `isolate` to get a copy before changing it in place.
+    """
+
+    def __init__(self, data=None):
+        self._data = {} if data is None else data
+        self._stamps = {key: next(_stamps) for key in self._data}
+        self._parent = None
+
+    @classmethod
+    def wrap(cls, context):
+        """Return context directly if it's already a `Context` otherwise
+        wrap it with a new `Context`."""
+        if isinstance(context, cls):
+            return context
+        return cls(context)
+
+    def fork(self):
+        """Return a new `Context` layered on top of this one."""
+        child = Context()
+        child._parent = self
+        return child
+
+    def _layers(self):
+        layer = self
+        while layer is not None:
+            yield layer
+            layer = layer._parent
+
+    def _stamp(self, key):
+        for layer in self._layers():
+            if key in layer._stamps:
+                return layer._stamps[key]
+        return 0
+
+    def stamps(self, keys):
+        """Return a tuple contains current stamp of each key."""
+        if self._parent is None:
+            return tuple(self._stamps.get(key, 0) for key in keys)
+        return tuple(self._stamp(key) for key in keys)
+
+    def _lookup(self, key):
+        """Return the layer which has key and its value, or `None` and
+        `_deleted` if it doesn't exist."""
+        for layer in self._layers():
+            data = layer._data
+            if key in data:
+                return layer, data[key]
+        return None, _deleted
+
+    def get(self, key, default=None):
+        value = self._lookup(key)[1]
+        return default if value is _deleted else value
+
+    def isolate(self, key):
+        """Return the value of key which can be changed in place without
+        affecting the parent and the siblings. An inherited dict, list, set
+        or bytearray is deep copied into this context with its stamp kept,
+        since the value is the same.
+        :raise KeyError: if key doesn't exist.
+        """
+        layer, value = self._lookup(key)
+        if value is _deleted:
+            raise KeyError(key)
+        if layer is not self and isinstance(value, _MUTABLE_TYPES):
+            value = copy.deepcopy(value)
+            self._data[key] = value
+            self._stamps[key] = layer._stamps.get(key, 0)
+        return value
+
+    def __getitem__(self, key):
+        value = self._lookup(key)[1]
+        if value is _deleted:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._stamps[key] = next(_stamps)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if self._parent is not None and key in self._parent:
+            self._data[key] = _deleted
+        else:
+            del self._data[key]
+        self._stamps[key] = next(_stamps)
+
+    def __contains__(self, key):
+        return self._lookup(key)[1] is not _deleted
+
+    def __iter__(self):
+        if self._parent is None:
+            yield from self._data
+            return
+        seen = set()
+        for layer in self._layers():
+            for key, value in layer._data.items():
+                if key in seen:
+                    continue
+                seen.add(key)
+                if value is not _deleted:
+                    yield key
+
+    def __len__(self):
+        if self._parent is None:
+            return len(self._data)
+        return sum(1 for _ in self)
+
+    def __deepcopy__(self, memo):
+        return Context(copy.deepcopy(dict(self), memo))
+
+    def __repr__(self):
+        return f"Context({dict(self)!r})"
@@ -37,7 +37,6 @@ warning_statuses = (
     301,
     302,
     303,
-    304,
     305,
     306,
     307,
@@ -45,6 +44,61 @@ warning_statuses = (
 )
 retries = 3  # Default maximum retry times.
 
+retry_backoff_factor = 1  # seconds before the first retry, doubled for each retry
+
+retry_max_delay = 60  # maximum seconds to wait before a retry
+
 max_iteration_count = 100  # maximum iteration loop count
 
 charset = "utf-8"  # Default response charset if not found in response header
+
+template_cache_size = 1024  # maximum compiled templates kept in memory
+
+json_path_cache_size = 256  # maximum compiled JSONPATH expressions kept in memory
+
+regex_cache_size = 512  # maximum compiled regex patterns kept in memory
+
+time_format_cache_size = 128  # maximum time conversion plans kept in memory
+
+stream_batch_size = 100  # number of streamed events wrapped in each batch
+
+pipe_batch_size = 1000  # maximum events buffered before written to pipe
+
+pipe_flush_interval = 1  # maximum seconds events stay in pipe buffer
+
+max_pending_jobs = 100  # maximum jobs submitted to engine but not done
+
+http_pool_connections = 10  # number of hosts cached by each pooled HTTP adapter
+
+http_pool_maxsize = 10  # maximum connections kept for each host
+
+http_pool_idle_timeout = 300  # seconds before an idle pooled HTTP adapter is closed
+
+async_max_workers = 32  # maximum threads running blocking calls for async engine
+
+async_max_per_host = 8  # maximum concurrent requests to a host in async engine
+
+async_max_concurrent_jobs = 1000  # maximum jobs running at once in async engine
+
+stream_chunk_size = 64 * 1024  # bytes read from a streamed response at once
+
+stream_spool_size = 8 * 1024 * 1024  # streamed body bytes kept in memory
+
+stream_max_body_size = 0  # maximum bytes of a streamed body, 0 means unlimited
+
+rate_limit_min_rate = 0.1  # minimum requests per second of an adaptive rate limit
+
+rate_limit_increase = 1  # requests per second an adaptive rate grows each second
+
+rate_limit_decrease_factor = 0.5  # multiplier of adaptive rate when throttled
+
+rate_limit_decrease_interval = 1  # minimum seconds between two rate decreases
+
+# response statuses which mean the host is throttling requests.
+rate_limit_throttle_statuses = (429, 503)
+
+not_modified_statuses = (304,)  # statuses which mean no new data since last request
+
+conditional_get_max_urls = 1000  # maximum urls which validators are kept for
+
+pagination_window = 4  # pages fetched concurrently by a paginated task
@@ -17,6 +17,7 @@ import threading
 
 from ..common.log import get_cc_logger
 from . import defaults
+from .context import Context
 from .exceptions import HTTPError, StopCCEIteration
 from .http import HttpClient
 
@@ -56,6 +57,7 @@ class CloudConnectEngine:
                 context=context,
                 checkpoint_mgr=checkpoint_mgr,
                 proxy=global_setting.proxy,
+                rate_limit=global_setting.get("rate_limit"),
             )
             self._running_job = job
             job.run()
@@ -92,7 +94,7 @@ class Job:
     reached it's stop condition.
     """
 
-    def __init__(self, request, context, checkpoint_mgr, proxy=None):
+    def __init__(self, request, context, checkpoint_mgr, proxy=None, rate_limit=None):
         """
         Constructs a `Job` with properties request, context and a
          optional proxy setting.
@@ -101,11 +103,12 @@ class Job:
          variables.
         :param proxy: A optional `Proxy` object contains proxy related
          settings.
+        :param rate_limit: A optional `RateLimit` object shared by requests.
         """
         self._request = request
-        self._context = context
+        self._context = Context.wrap(context)
         self._checkpoint_mgr = checkpoint_mgr
-        self._client = HttpClient(proxy)
+        self._client = HttpClient(proxy, rate_limit=rate_limit)
         self._stopped = True
         self._should_stop = False
 
@@ -318,7 +321,7 @@ class Job:
         status = response.status_code
 
         if status in defaults.success_statuses:
-            if not (response.body or "").strip():
+            if response.is_blank():
                 _logger.info(
                     "The response body of request which url=%s and"
                     " method=%s is empty, status=%s.",
@@ -329,6 +332,16 @@ class Job:
                 return None, True
             return response, False
 
+        if status in defaults.not_modified_statuses:
+            _logger.info(
+                "The resource of request which url=%s and method=%s is not"
+                " modified, status=%s.",
+                request.url,
+                request.method,
+                status,
+            )
+            return None, True
+
         error_log = (
             "The response status=%s for request which url=%s and" " method=%s."
         ) % (status, request.url, request.method)
@@ -0,0 +1,148 @@
+#
+# Copyright 2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import asyncio
+import concurrent.futures as cf
+from os import path as op
+
+from ..common.log import get_cc_logger
+from . import defaults
+from .http import HostLimiter
+from .plugin import init_pipeline_plugins
+
+logger = get_cc_logger()
+
+
+class AsyncCloudConnectEngine:
+    """
+    AsyncCloudConnectEngine runs jobs as coroutines in an event loop. HTTP
+    requests and pipeline functions run in a bounded thread pool so that a
+    large number of jobs progress without a thread for each of them.
+
+    Requests are still sent by the blocking `requests` library, so at most
+    `max_workers` requests are in flight and throughput is the same as
+    `CloudConnectEngine` with as many workers. The engine adds the limit of
+    concurrent requests per host and the cap of running jobs.
+    """
+
+    def __init__(
+        self,
+        max_workers=defaults.async_max_workers,
+        plugin_dir="",
+        max_per_host=defaults.async_max_per_host,
+        max_concurrent_jobs=defaults.async_max_concurrent_jobs,
+    ):
+        """
+        Initialize AsyncCloudConnectEngine object
+        :param max_workers: maximum number of threads to run blocking calls
+        :param plugin_dir: Absolute path of directory containing cce_plugin_*.py
+        :param max_per_host: maximum number of concurrent requests to a host
+        :param max_concurrent_jobs: maximum number of jobs running at once
+        """
+        self._max_workers = max_workers
+        self._max_per_host = max_per_host
+        self._max_concurrent_jobs = max_concurrent_jobs
+        self._shutdown = False
+        self._running_jobs = set()
+        self._counter = 0
+        plugin_dir = plugin_dir or op.join(op.dirname(op.dirname(__file__)), "plugin")
+        init_pipeline_plugins(plugin_dir)
+
+    def start(self, jobs=None):
+        """
+        Engine starts to run jobs and returns when all jobs are done
+        :param jobs: A list contains at least one job
+        """
+        if not jobs:
+            logger.warning("AsyncCloudConnectEngine just exits with no jobs to run")
+            return
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self._run(jobs))
+        except Exception:
+            logger.exception("AsyncCloudConnectEngine encountered exception")
+        finally:
+            loop.close()
+
+    async def _run(self, jobs):
+        executor = cf.ThreadPoolExecutor(self._max_workers)
+        limiter = HostLimiter(self._max_per_host)
+        # Sources of spawned jobs are used as a stack so that jobs spawned
+        # lately are run before more of their siblings are pulled
+        job_sources = [iter(jobs)]
+        pending = set()
+        try:
+            logger.info("AsyncCloudConnectEngine starts to run...")
+            while not self._shutdown:
+                while job_sources and len(pending) < self._max_concurrent_jobs:
+                    try:
+                        job = next(job_sources[-1], None)
+                    except Exception:
+                        logger.exception("Failed to pull jobs spawned")
+                        job = None
+                    if job is None:
+                        job_sources.pop()
+                        continue
+                    pending.add(
+                        asyncio.ensure_future(self._invoke_job(job, executor, limiter))
+                    )
+                    self._counter += 1
+                if not pending:
+                    logger.info("AsyncCloudConnectEngine has no more jobs to run")
+                    break
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    job_sources.append(iter(future.result()))
+        finally:
+            logger.info("AsyncCloudConnectEngine is going to tear down...")
+            self._shutdown = True
+            for job in list(self._running_jobs):
+                job.stop()
+            if pending:
+                await asyncio.wait(pending)
+            for source in job_sources:
+                if hasattr(source, "close"):
+                    source.close()
+            executor.shutdown(wait=True)
+            logger.info(
+                "AsyncCloudConnectEngine successfully tears down after %s job(s)",
+                self._counter,
+            )
+
+    async def _invoke_job(self, job, executor, limiter):
+        """
+        Wrap the run_async method of jobs
+        :return: An iterable of jobs spawned
+        """
+        if self._shutdown:
+            return []
+        self._running_jobs.add(job)
+        try:
+            return await job.run_async(executor, limiter) or []
+        except Exception:
+            logger.exception("job %s is invoked with exception", job)
+            return []
+        finally:
+            self._running_jobs.discard(job)
+
+    def shutdown(self):
+        """
+        set the shutdown flag to True, running jobs are stopped and no more
+        job is started
+        """
+        self._shutdown = True
+        logger.info("AsyncCloudConnectEngine receives shutdown signal")
@@ -14,24 +14,48 @@
 # limitations under the License.
 #
 import concurrent.futures as cf
+import heapq
+import itertools
 import threading
-from collections import Iterable
+import time
+from collections.abc import Iterable, Iterator
 from os import path as op
 
 from ..common.log import get_cc_logger
+from . import defaults
 from .plugin import init_pipeline_plugins
+from .task import RetryLater
 
 logger = get_cc_logger()
 
 
+class _Pulled:
+    """An item pulled from a source of spawned jobs in a worker."""
+
+    def __init__(self, source, item):
+        self.source = source
+        self.item = item
+
+
 class CloudConnectEngine:
-    def __init__(self, max_workers=4, plugin_dir=""):
+    def __init__(
+        self, max_workers=4, plugin_dir="", max_pending_jobs=defaults.max_pending_jobs
+    ):
         """
         Initialize CloudConnectEngine object
         :param max_workers: maximum number of Threads to execute the given calls
         :param plugin_dir: Absolute path of directory containing cce_plugin_*.py
+        :param max_pending_jobs: maximum number of jobs submitted but not done,
+            more jobs are pulled from spawned jobs as pending ones are done
         """
         self._executor = cf.ThreadPoolExecutor(max_workers)
+        self._max_pending_jobs = max_pending_jobs
+        # Sources of spawned jobs are used as a stack so that jobs spawned
+        # lately are run before more of their siblings are pulled
+        self._job_sources = []
+        # Sources of jobs waiting to retry, in a heap of (due, seq, source)
+        self._delayed_sources = []
+        self._sequence = itertools.count()
         self._pending_job_results = set()
         self._shutdown = False
         self._pending_jobs = []
@@ -50,17 +74,22 @@ class CloudConnectEngine:
             if not jobs:
                 logger.warning("CloudConnectEngine just exits with no jobs to run")
                 return
-            for job in jobs:
-                self._add_job(job)
+            self._job_sources.append(iter(jobs))
+            self._schedule_jobs()
             while not self._shutdown:
                 logger.info("CloudConnectEngine starts to run...")
-                if not self._pending_job_results:
+                if not self._pending_job_results and not self._delayed_sources:
                     logger.info("CloudConnectEngine has no more jobs to run")
                     break
+                timeout = None
+                if self._delayed_sources:
+                    timeout = max(self._delayed_sources[0][0] - time.monotonic(), 0)
                 # check the intermediate results to find the done jobs and not
                 # done jobs
                 done_and_not_done_jobs = cf.wait(
-                    self._pending_job_results, return_when=cf.FIRST_COMPLETED
+                    self._pending_job_results,
+                    timeout=timeout,
+                    return_when=cf.FIRST_COMPLETED,
                 )
                 self._pending_job_results = done_and_not_done_jobs.not_done
                 done_job_results = done_and_not_done_jobs.done
@@ -68,17 +97,65 @@ class CloudConnectEngine:
                     # get the result of each done jobs and add new jobs to the
                     # engine if the result spawns more jobs
                     result = future.result()
-                    if result:
+                    if isinstance(result, _Pulled):
+                        self._add_pulled(result.source, result.item)
+                    elif result:
                         if isinstance(result, Iterable):
-                            for temp in result:
-                                self._add_job(temp)
+                            self._job_sources.append(iter(result))
                         else:
-                            self._add_job(result)
+                            self._job_sources.append(iter((result,)))
+                self._schedule_jobs()
         except Exception:
             logger.exception("CloudConnectEngine encountered exception")
         finally:
             self._teardown()
 
+    def _add_pulled(self, source, item):
+        """
+        put a source back with the item pulled from it, a source which asks
+        to retry later is delayed until it's due
+        """
+        if item is None:
+            return
+        if isinstance(item, RetryLater):
+            heapq.heappush(
+                self._delayed_sources, (item.due, next(self._sequence), source)
+            )
+            return
+        self._job_sources.append(source)
+        self._job_sources.append(iter((item,)))
+
+    def _schedule_jobs(self):
+        """
+        resume delayed jobs which are due and pull jobs from spawned job
+        sources until the number of pending jobs reaches the limit
+        """
+        now = time.monotonic()
+        while (
+            self._delayed_sources
+            and self._delayed_sources[0][0] <= now
+            and len(self._pending_job_results) < self._max_pending_jobs
+        ):
+            _, _, source = heapq.heappop(self._delayed_sources)
+            if not self._submit(self._pull_job, source):
+                return
+        while self._job_sources and (
+            len(self._pending_job_results) < self._max_pending_jobs
+        ):
+            job = next(self._job_sources[-1], None)
+            if job is None:
+                self._job_sources.pop()
+            elif isinstance(job, RetryLater):
+                self._add_pulled(self._job_sources.pop(), job)
+            elif not self._add_job(job):
+                return
+
+    def _submit(self, fn, *args):
+        if self._shutdown:
+            return False
+        self._pending_job_results.add(self._executor.submit(fn, *args))
+        return True
+
     def _add_job(self, job):
         """
         add job to engine for scheduling later
@@ -101,19 +178,50 @@ class CloudConnectEngine:
         :param job: job should have a 'run' method
         :return:
         """
+        spawning = False
         try:
             # just return when the engine has shut down
             if self._shutdown:
                 return None
             invoke_result = job.run()
-            return invoke_result
+            if not isinstance(invoke_result, Iterator):
+                return invoke_result
+            spawning = True
         except Exception:
             logger.exception("job %s is invoked with exception", job)
             return None
         finally:
             # remove the job from pending_jobs when it's done
-            with self._lock:
-                self._pending_jobs.remove(job)
+            if not spawning:
+                self._remove_pending_job(job)
+        # Jobs spawned lazily do their work while the first one is pulled,
+        # pull it here instead of in the thread of engine.
+        return self._pull_job(self._iter_spawned_jobs(job, invoke_result))
+
+    @staticmethod
+    def _pull_job(source):
+        return _Pulled(source, next(source, None))
+
+    def _iter_spawned_jobs(self, job, jobs):
+        """
+        iterate jobs spawned by a job, the job keeps pending until all of
+        them are pulled
+        """
+        try:
+            yield from jobs
+        except Exception:
+            logger.exception("job %s is invoked with exception", job)
+        finally:
+            self._remove_pending_job(job)
+
+    def _remove_pending_job(self, job):
+        with self._lock:
+            self._pending_jobs.remove(job)
+
+    @staticmethod
+    def _drain_jobs(source):
+        for _ in source:
+            pass
 
     def shutdown(self):
         """
@@ -134,7 +242,16 @@ class CloudConnectEngine:
         logger.info("CloudConnectEngine is going to tear down...")
         self._shutdown = True
         with self._lock:
-            for job in self._pending_jobs:
+            for job in list(self._pending_jobs):
                 job.stop()
+        # jobs waiting to retry are resumed to finish as they are stopped
+        for _, _, source in self._delayed_sources:
+            self._executor.submit(self._drain_jobs, source)
+        self._delayed_sources = []
         self._executor.shutdown(wait=True)
+        # close sources of spawned jobs which are not pulled to the end
+        for source in self._job_sources:
+            if hasattr(source, "close"):
+                source.close()
+        self._job_sources = []
         logger.info("CloudConnectEngine successfully tears down")
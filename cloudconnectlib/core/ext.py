@@ -17,17 +17,51 @@ import calendar
 import json
 import re
 import traceback
-from collections import Iterable
+from collections.abc import Iterable
+from collections.abc import Iterator
 from datetime import datetime
+from functools import lru_cache
 
 from jsonpath_ng import parse
 
 from ..common import log, util
+from . import defaults
 from .exceptions import FuncException, QuitJobError, StopCCEIteration
+from .http import HTTPResponse, ResponseBody, StreamingHTTPResponse
+from .jsonpath import find_values, simplify
+from .jsonstream import iter_json_path, iter_json_records, parse_streamable_path
 from .pipemgr import PipeManager
+from .template import is_literal
 
 _logger = log.get_cc_logger()
 
+_NOT_SET = object()
+
+# Sources which are JSON text and can be parsed incrementally.
+_JSON_TEXT = (str, bytes, StreamingHTTPResponse)
+
+# Sources which parse themselves as JSON at most once.
+_JSON_DOCUMENTS = (ResponseBody, HTTPResponse, StreamingHTTPResponse)
+
+
+@lru_cache(maxsize=defaults.regex_cache_size)
+def compile_regex(pattern, flags=0):
+    """Compile a regex pattern. Compiled patterns are shared process wide
+    and keyed by the pattern string and flags.
+    :param pattern: regex pattern
+    :param flags: flags for regex
+    :return: A compiled regex pattern
+    """
+    return re.compile(pattern, flags)
+
+
+def _get_regex(pattern, flags):
+    if isinstance(pattern, re.Pattern):
+        if not flags or pattern.flags & flags == flags:
+            return pattern
+        pattern = pattern.pattern
+    return compile_regex(pattern, flags)
+
 
 def regex_search(pattern, source, flags=0):
     """Search substring in source through regex"""
@@ -35,7 +69,7 @@ def regex_search(pattern, source, flags=0):
         _logger.warning("Cannot apply regex search on non-string: %s", type(source))
         return {}
     try:
-        matches = re.search(pattern=pattern, string=source, flags=flags)
+        matches = _get_regex(pattern, flags).search(source)
     except Exception:
         _logger.warning(
             "Unable to search pattern=%s and flags=%s in string, error=%s",
@@ -58,7 +92,7 @@ def regex_match(pattern, source, flags=0):
     :return: `True` if candidate match pattern else `False`
     """
     try:
-        return re.match(pattern, source, flags) is not None
+        return _get_regex(pattern, flags).match(source) is not None
     except Exception:
         _logger.warning(
             "Unable to match source with pattern=%s, cause=%s",
@@ -68,23 +102,46 @@ def regex_match(pattern, source, flags=0):
     return False
 
 
+@lru_cache(maxsize=defaults.json_path_cache_size)
+def compile_json_path(json_path_expr):
+    """Compile a JSONPATH expression. Compiled expressions are shared
+    process wide and keyed by the expression string. Simple expressions
+    which only contain child fields and "[*]" are compiled to a
+    `SimpleJSONPath` evaluated without jsonpath_ng object model.
+    :param json_path_expr: JSONPATH expression
+    :return: A compiled JSONPATH expression
+    """
+    expression = parse(json_path_expr)
+    return simplify(expression) or expression
+
+
+def _load_json(source):
+    """Load JSON from a string, the response body is parsed only once."""
+    if isinstance(source, _JSON_DOCUMENTS):
+        return source.json()
+    return json.loads(source)
+
+
 def json_path(source, json_path_expr):
     """Extract value from string with JSONPATH expression.
-    :param json_path_expr: JSONPATH expression
-    :param source: string to extract value
-    :return: A `list` contains all values extracted
+    :param json_path_expr: JSONPATH expression or a compiled one
+    :param source: string or response to extract value, a response is
+        parsed from its raw bytes without decoding body.
+    :return: A `list` contains all values extracted. Values extracted from
+        a response are shared with the document parsed once for it and
+        with other extractions, they must be copied before changed.
     """
     if not source:
         _logger.debug("source to apply JSONPATH is empty, return empty.")
         return ""
 
-    if isinstance(source, str):
+    if isinstance(source, (str, HTTPResponse, StreamingHTTPResponse)):
         _logger.debug(
             "source expected is a JSON, not %s. Attempt to" " convert it to JSON",
             type(source),
         )
         try:
-            source = json.loads(source)
+            source = _load_json(source)
         except Exception as ex:
             _logger.warning(
                 "Unable to load JSON from source: %s. "
@@ -94,8 +151,11 @@ def json_path(source, json_path_expr):
             )
 
     try:
-        expression = parse(json_path_expr)
-        results = [match.value for match in expression.find(source)]
+        if isinstance(json_path_expr, str):
+            expression = compile_json_path(json_path_expr)
+        else:
+            expression = json_path_expr
+        results = find_values(expression, source)
 
         _logger.debug(
             'Got %s elements extracted with JSONPATH expression "%s"',
@@ -118,11 +178,96 @@ def json_path(source, json_path_expr):
     return ""
 
 
+def json_stream(source, json_path_expr):
+    """Extract values from JSON source with JSONPATH expression lazily.
+    Simple expressions like "$.items[*]" are evaluated incrementally so that
+    only one value is kept in memory, the others fall back to parsing
+    whole source.
+    :param source: JSON as `str` or `bytes`, a file like object, an
+        iterable of `str` or `bytes` chunks or a `StreamingHTTPResponse`.
+    :param json_path_expr: JSONPATH expression
+    :return: A generator of extracted values.
+    """
+    if not source:
+        _logger.debug("source to apply JSONPATH is empty, return empty.")
+        return iter(())
+    if parse_streamable_path(json_path_expr) is None or isinstance(
+        source, HTTPResponse
+    ):
+        # A HTTPResponse holds whole body already, parse it from bytes.
+        return _iter_json_path_matches(source, json_path_expr)
+    return _iter_streamed_values(source, json_path_expr)
+
+
+def _iter_json_path_matches(source, json_path_expr):
+    try:
+        if isinstance(source, (str, HTTPResponse, StreamingHTTPResponse)):
+            source = _load_json(source)
+        if isinstance(json_path_expr, str):
+            json_path_expr = compile_json_path(json_path_expr)
+        values = find_values(json_path_expr, source)
+    except Exception as ex:
+        _logger.warning(
+            'Unable to apply JSONPATH expression "%s" on source, message=%s',
+            json_path_expr,
+            ex,
+        )
+        return
+    yield from values
+
+
+def _iter_streamed_values(source, json_path_expr, iterate=iter_json_path):
+    count = 0
+    try:
+        for value in iterate(source, json_path_expr):
+            count += 1
+            yield value
+    except ValueError as ex:
+        _logger.warning(
+            'Unable to apply JSONPATH expression "%s" on source incrementally'
+            " after %s elements, message=%s",
+            json_path_expr,
+            count,
+            ex,
+        )
+    _logger.debug(
+        'Got %s elements extracted with JSONPATH expression "%s"',
+        count,
+        json_path_expr,
+    )
+
+
+def _iter_xml_events(candidates, **kwargs):
+    batch = []
+    for candidate in candidates:
+        batch.append(candidate)
+        if len(batch) >= defaults.stream_batch_size:
+            yield from util.format_events(batch, **kwargs)
+            batch = []
+    if batch:
+        yield from util.format_events(batch, **kwargs)
+
+
+def _event_time(time):
+    time = time or None
+    if time:
+        try:
+            time = float(time)
+        except ValueError:
+            _logger.warning(
+                '"time" %s is expected to be a float, set "time" to None', time
+            )
+            time = None
+    return time
+
+
 def splunk_xml(
     candidates, time=None, index=None, host=None, source=None, sourcetype=None
 ):
     """Wrap a event with splunk xml format.
-    :param candidates: data used to wrap as event
+    :param candidates: data used to wrap as event. If it's an iterator like
+        the one returned by `json_stream`, events are wrapped lazily in
+        batches and a generator is returned.
     :param time: timestamp which must be empty or a valid float
     :param index: index name for event
     :param host: host for event
@@ -130,18 +275,20 @@ def splunk_xml(
     :param sourcetype: sourcetype for event
     :return: A wrapped event with splunk xml format.
     """
-    if not isinstance(candidates, (list, tuple)):
+    streaming = isinstance(candidates, Iterator)
+    if not streaming and not isinstance(candidates, (list, tuple)):
         candidates = [candidates]
 
-    time = time or None
-    if time:
-        try:
-            time = float(time)
-        except ValueError:
-            _logger.warning(
-                '"time" %s is expected to be a float, set "time" to None', time
-            )
-            time = None
+    time = _event_time(time)
+    if streaming:
+        return _iter_xml_events(
+            candidates,
+            time=time,
+            index=index,
+            host=host,
+            source=source,
+            sourcetype=sourcetype,
+        )
     xml_events = util.format_events(
         candidates,
         time=time,
@@ -155,38 +302,126 @@ def splunk_xml(
 
 
 def std_output(candidates):
-    """Output a string to stdout.
-    :param candidates: List of string to output to stdout or a single string.
+    """Output a string to stdout. Events are written in batches and all
+    of them are flushed before return.
+    :param candidates: List or iterator of string to output to stdout or
+        a single string.
     """
     if isinstance(candidates, str):
         candidates = [candidates]
 
+    pipe = PipeManager()
     all_str = True
-    for candidate in candidates:
-        if all_str and not isinstance(candidate, str):
-            all_str = False
-            _logger.debug(
-                'The type of data needs to print is "%s" rather than str',
-                type(candidate),
-            )
-            try:
-                candidate = json.dumps(candidate)
-            except:
-                _logger.exception(
-                    'The type of data needs to print is "%s"' " rather than str",
-                    type(candidate),
-                )
-
-        if not PipeManager().write_events(candidate):
-            raise FuncException(
-                "Fail to output data to stdout. The event"
-                " writer is stopped or encountered exception"
-            )
+    written = True
+    try:
+        for candidate in candidates:
+            if not isinstance(candidate, str):
+                if all_str:
+                    all_str = False
+                    _logger.debug(
+                        'The type of data needs to print is "%s" rather than str',
+                        type(candidate),
+                    )
+                try:
+                    candidate = json.dumps(candidate)
+                except:
+                    _logger.exception(
+                        'The type of data needs to print is "%s" rather than str',
+                        type(candidate),
+                    )
+
+            if not pipe.buffer_events((candidate,)):
+                written = False
+                break
+    finally:
+        written = pipe.flush() and written
+
+    if not written:
+        raise FuncException(
+            "Fail to output data to stdout. The event"
+            " writer is stopped or encountered exception"
+        )
 
     _logger.debug("Writing events to stdout finished.")
     return True
 
 
+def _iter_records(values):
+    # Same as `json_path`, a single list value is expanded to its elements.
+    values = iter(values)
+    first = next(values, _NOT_SET)
+    second = next(values, _NOT_SET)
+    if second is _NOT_SET:
+        if isinstance(first, list):
+            yield from first
+        elif first is not _NOT_SET and first:
+            yield first
+        return
+    yield first
+    yield second
+    yield from values
+
+
+def _iter_json_records(source, json_path_expr):
+    if isinstance(json_path_expr, str):
+        streamable = parse_streamable_path(json_path_expr)
+        if streamable and not streamable[1] and isinstance(source, _JSON_TEXT):
+            # The path matches at most one value, an array is expanded
+            # without loading the whole value.
+            return _iter_streamed_values(source, json_path_expr, iter_json_records)
+    if isinstance(source, _JSON_TEXT):
+        return _iter_records(json_stream(source, json_path_expr))
+    return _iter_records(_iter_json_path_matches(source, json_path_expr))
+
+
+def json_emit(
+    source,
+    json_path_expr,
+    time=None,
+    index=None,
+    host=None,
+    event_source=None,
+    sourcetype=None,
+):
+    """Extract records from JSON source with JSONPATH expression, wrap them
+    with splunk xml format and output them to stdout in batches. It works
+    like `json_path`, `splunk_xml` and `std_output` in a row but records are
+    never collected into lists, and nothing is written if no record found.
+    :param source: JSON to extract records
+    :param json_path_expr: JSONPATH expression or a compiled one
+    :param time: timestamp which must be empty or a valid float
+    :param index: index name for event
+    :param host: host for event
+    :param event_source: source for event
+    :param sourcetype: sourcetype for event
+    :return: A `dict` contains "count" of written records and the "last"
+        record for checkpoint.
+    """
+    result = {"count": 0, "last": None}
+    if not source:
+        _logger.debug("source to emit is empty, return directly.")
+        return result
+
+    def track(records):
+        for record in records:
+            result["count"] += 1
+            result["last"] = record
+            yield record
+
+    std_output(
+        _iter_xml_events(
+            track(_iter_json_records(source, json_path_expr)),
+            time=_event_time(time),
+            index=index,
+            host=host,
+            source=event_source,
+            sourcetype=sourcetype,
+        )
+    )
+    _logger.debug("[%s] records are written as splunk stream xml", result["count"])
+    return result
+
+
 def _parse_json(source, json_path_expr=None):
     if not source:
         _logger.debug("Unable to parse JSON from empty source, return empty.")
@@ -200,7 +435,7 @@ def _parse_json(source, json_path_expr=None):
         source = json_path(source, json_path_expr)
 
     elif isinstance(source, str):
-        source = json.loads(source)
+        source = _load_json(source)
 
     return source
 
@@ -289,10 +524,96 @@ def _fix_timestamp_format(fmt, timestamp):
     )
 
 
-def time_str2str(date_string, from_format, to_format):
-    """Convert a date string with given format to another format. Return
-    the original date string if it's type is not string or failed to parse or
-    convert it with format."""
+# Matches "%s" and "%Nf" in a time format, each of them is a directive only
+# if the number of "%" is odd.
+_TIME_DIRECTIVE = re.compile(r"(%+)(s|([1-6])f)")
+
+_TIMESTAMP = object()
+
+# ISO-8601 formats which are parsed without `strptime`, the regex is as
+# strict as `strptime` so anything else falls back to it.
+_ISO_PATTERNS = {
+    "%Y-%m-%dT%H:%M:%S": r"(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)()",
+    "%Y-%m-%d %H:%M:%S": r"(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d)()",
+    "%Y-%m-%dT%H:%M:%S.%f": r"(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)\.(\d{1,6})",
+    "%Y-%m-%d %H:%M:%S.%f": r"(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d)\.(\d{1,6})",
+    "%Y-%m-%dT%H:%M:%SZ": r"(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)()Z",
+    "%Y-%m-%dT%H:%M:%S.%fZ": r"(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)\.(\d{1,6})Z",
+}
+
+
+def _iso_parser(pattern, from_format):
+    match = re.compile(pattern).fullmatch
+
+    def parse(date_string):
+        matched = match(date_string)
+        if matched:
+            year, month, day, hour, minute, second, fraction = matched.groups()
+            try:
+                return datetime(
+                    int(year),
+                    int(month),
+                    int(day),
+                    int(hour),
+                    int(minute),
+                    int(second),
+                    int(fraction.ljust(6, "0")),
+                )
+            except ValueError:
+                pass
+        return datetime.strptime(date_string, from_format)
+
+    return parse
+
+
+def _plan_time_format(to_format):
+    """Split to_format into `strftime` formats, `_TIMESTAMP` for "%s" and
+    digit count for "%Nf". This is what `_fix_timestamp_format` and
+    `_fix_microsecond_format` do but only once for each format."""
+    if not to_format:
+        return (to_format,)
+    pieces = []
+    start = 0
+    for matched in _TIME_DIRECTIVE.finditer(to_format):
+        percents = matched.group(1)
+        if len(percents) % 2 == 0:
+            continue
+        pieces.append(to_format[start : matched.start()] + percents[1:])
+        digits = matched.group(3)
+        pieces.append(_TIMESTAMP if digits is None else int(digits))
+        start = matched.end()
+    pieces.append(to_format[start:])
+    return tuple(piece for piece in pieces if piece != "")
+
+
+@lru_cache(maxsize=defaults.time_format_cache_size)
+def _time_conversion(from_format, to_format):
+    pattern = _ISO_PATTERNS.get(from_format)
+    if pattern:
+        parse = _iso_parser(pattern, from_format)
+    else:
+
+        def parse(date_string):
+            return datetime.strptime(date_string, from_format)
+
+    return parse, _plan_time_format(to_format)
+
+
+def _format_time(dt, pieces):
+    if len(pieces) == 1 and isinstance(pieces[0], str):
+        return dt.strftime(pieces[0])
+    parts = []
+    for piece in pieces:
+        if piece is _TIMESTAMP:
+            parts.append(str(calendar.timegm(dt.timetuple())))
+        elif isinstance(piece, int):
+            parts.append(str(dt.microsecond).zfill(6)[:piece])
+        else:
+            parts.append(dt.strftime(piece))
+    return "".join(parts)
+
+
+def _convert_time(date_string, from_format, to_format):
     if not isinstance(date_string, str):
         _logger.warning(
             '"date_string" must be a string type, found %s,'
@@ -302,16 +623,12 @@ def time_str2str(date_string, from_format, to_format):
         return date_string
 
     try:
-        dt = datetime.strptime(date_string, from_format)
-        # Need to pre process '%s' in to_format here because '%s' is not
-        # available on all platforms. Even on supported platforms, the
-        # result may be different because it depends on implementation on each
-        # platform. Replace it with UTC timestamp here directly.
-        if to_format:
-            timestamp = calendar.timegm(dt.timetuple())
-            to_format = _fix_timestamp_format(to_format, str(timestamp))
-            to_format = _fix_microsecond_format(to_format, str(dt.microsecond))
-        return dt.strftime(to_format)
+        # '%s' in to_format is replaced with UTC timestamp directly because
+        # '%s' is not available on all platforms. Even on supported
+        # platforms, the result may be different because it depends on
+        # implementation on each platform.
+        parse, pieces = _time_conversion(from_format, to_format)
+        return _format_time(parse(date_string), pieces)
     except Exception:
         _logger.warning(
             'Unable to convert date_string "%s" from format "%s" to "%s",'
@@ -324,6 +641,35 @@ def time_str2str(date_string, from_format, to_format):
     return date_string
 
 
+def time_str2str(date_string, from_format, to_format):
+    """Convert a date string with given format to another format. Return
+    the original date string if it's type is not string or failed to parse or
+    convert it with format."""
+    return _convert_time(date_string, from_format, to_format)
+
+
+def time_str2str_batch(date_strings, from_format, to_format):
+    """Convert a list of date strings with given format to another format.
+    Each of the date strings is converted same as `time_str2str`.
+    :param date_strings: a list of date strings.
+    :param from_format: format of the date strings.
+    :param to_format: target format.
+    :return: A `list` contains converted date strings or `date_strings`
+        itself if it's not iterable.
+    """
+    if isinstance(date_strings, (str, dict)) or not isinstance(date_strings, Iterable):
+        _logger.warning(
+            '"date_strings" must be a list, found %s,'
+            " return the original date_strings directly.",
+            type(date_strings),
+        )
+        return date_strings
+    return [
+        _convert_time(date_string, from_format, to_format)
+        for date_string in date_strings
+    ]
+
+
 def is_true(value):
     """Determine whether value is True"""
     return str(value).strip().lower() == "true"
@@ -347,9 +693,25 @@ def assert_true(value, message=None):
         raise AssertionError(message or f'"{value}" is not true')
 
 
+def _iter_split_values(source, target):
+    try:
+        for value in source:
+            yield {target: value}
+    except Exception as ex:
+        _logger.warning(
+            "split_by method encountered exception " "source=%s message=%s cause=%s",
+            source,
+            ex,
+            traceback.format_exc(),
+        )
+
+
 def split_by(source, target, separator=None):
-    """Split the source to multiple values by the separator"""
+    """Split the source to multiple values by the separator. Values are
+    split lazily if source is an iterator."""
     try:
+        if isinstance(source, Iterator):
+            return _iter_split_values(source, target)
         if not source:
             return []
         elif isinstance(source, str) and separator:
@@ -382,13 +744,62 @@ _extension_functions = {
     "splunk_xml": splunk_xml,
     "std_output": std_output,
     "json_path": json_path,
+    "json_stream": json_stream,
+    "json_emit": json_emit,
     "json_empty": json_empty,
     "json_not_empty": json_not_empty,
     "time_str2str": time_str2str,
+    "time_str2str_batch": time_str2str_batch,
     "split_by": split_by,
 }
 
 
+# Arguments which can be compiled once if they're literal, keyed by method
+# name and then the position of argument.
+_argument_compilers = {
+    "regex_match": {0: compile_regex},
+    "regex_search": {0: compile_regex},
+    "json_path": {1: compile_json_path},
+    "json_empty": {1: compile_json_path},
+    "json_not_empty": {1: compile_json_path},
+}
+
+
+def precompile_arguments(method, arguments):
+    """Compile literal arguments of a predefined function ahead of time so
+    that they needn't be compiled each time the function is called.
+    :param method: function name.
+    :param arguments: raw arguments of the function.
+    :return: A `list` contains arguments in which the literal ones are
+        replaced with the compiled ones.
+    :raise ValueError: if a literal regex pattern is invalid.
+    """
+    arguments = list(arguments or ())
+    compilers = _argument_compilers.get(method)
+    if not compilers:
+        return arguments
+    for index, compiler in compilers.items():
+        if index >= len(arguments):
+            continue
+        argument = arguments[index]
+        if not argument or not isinstance(argument, str) or not is_literal(argument):
+            continue
+        try:
+            arguments[index] = compiler(argument)
+        except re.error as ex:
+            raise ValueError(
+                f'Invalid regex pattern "{argument}" of method {method}: {ex}'
+            ) from ex
+        except Exception as ex:
+            _logger.warning(
+                'Unable to compile argument "%s" of method %s: %s',
+                argument,
+                method,
+                ex,
+            )
+    return arguments
+
+
 def lookup_method(name):
     """Find a predefined function with given function name.
     :param name: function name.
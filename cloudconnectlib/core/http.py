@@ -13,12 +13,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import asyncio
+import codecs
+import itertools
+import json
+import random
+import tempfile
+import threading
 import time
 import traceback
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
 import requests
 
 import munch
 from requests import PreparedRequest, Session, utils
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 from solnlib.utils import is_true
 
 from cloudconnectlib.common import util
@@ -29,9 +42,37 @@ from cloudconnectlib.core.exceptions import HTTPError
 _logger = get_cc_logger()
 
 
+class ResponseBody(str):
+    """
+    ResponseBody is the decoded response body which parses itself as JSON
+    at most once, so that functions extracting data from the same body
+    share the parsed document.
+    """
+
+    def json(self):
+        """
+        Return the parsed JSON document of body. Callers share the same
+        document which must not be modified.
+        :return: A `dict` or `list` or other JSON value.
+        """
+        try:
+            parsed, error = self._json
+        except AttributeError:
+            try:
+                parsed, error = json.loads(self), None
+            except ValueError as ex:
+                parsed, error = None, ex
+            self._json = parsed, error
+        if error is not None:
+            raise error
+        return parsed
+
+
 class HTTPResponse:
     """
     HTTPResponse class wraps response of HTTP request for later use.
+    Content is kept as `bytes` and decoded only when body is accessed,
+    JSON is parsed from `bytes` directly if charset allows.
     """
 
     def __init__(self, response, content):
@@ -39,7 +80,9 @@ class HTTPResponse:
         with requests.Session() request"""
         self._status_code = response.status_code
         self._header = response
-        self._body = self._decode_content(response.headers, content)
+        self._content = content or b""
+        self._body = None
+        self._json = None
 
     @staticmethod
     def _decode_content(response, content):
@@ -47,15 +90,8 @@ class HTTPResponse:
             return ""
 
         charset = utils.get_encoding_from_headers(response)
-
         if charset is None:
             charset = defaults.charset
-            _logger.info(
-                "Unable to find charset in response headers," ' set it to default "%s"',
-                charset,
-            )
-
-        _logger.info("Decoding response content with charset=%s", charset)
 
         try:
             return content.decode(charset, errors="replace")
@@ -69,18 +105,81 @@ class HTTPResponse:
 
         return content.decode("utf-8", errors="replace")
 
+    def _unicode_charset(self):
+        """Return the normalized charset name if it's a UTF encoding which
+        `json.loads` detects from `bytes`, otherwise `None`."""
+        charset = utils.get_encoding_from_headers(self._header.headers)
+        try:
+            name = codecs.lookup(charset or defaults.charset).name
+        except LookupError:
+            return None
+        return name if name.startswith("utf") else None
+
     @property
     def header(self):
         return self._header
 
+    @property
+    def headers(self):
+        """
+        Return response headers.
+        :return: A case-insensitive `dict`
+        """
+        return self._header.headers
+
+    @property
+    def raw(self):
+        """
+        Return response body as `bytes` without decoding.
+        :return: A `bytes`
+        """
+        return self._content
+
     @property
     def body(self):
         """
-        Return response body as a `string`.
+        Return response body as a `string`. It's decoded on first access.
         :return: A `string`
         """
+        if self._body is None:
+            self._body = ResponseBody(
+                self._decode_content(self._header.headers, self._content)
+            )
+            if self._json is not None:
+                # Share the document already parsed from bytes.
+                self._body._json = self._json
         return self._body
 
+    @property
+    def text(self):
+        """
+        Return response body as a `string`, same as `body`.
+        :return: A `string`
+        """
+        return self.body
+
+    def json(self):
+        """
+        Return response body parsed as JSON. Body is parsed only once and
+        the result is shared with functions which extract data from body,
+        it must not be modified.
+        :return: A `dict` or `list` or other JSON value.
+        """
+        if self._body is not None or self._unicode_charset() is None:
+            return self.body.json()
+        if self._json is None:
+            try:
+                self._json = json.loads(self._content), None
+            except UnicodeDecodeError:
+                # Invalid bytes are replaced when decoding body.
+                return self.body.json()
+            except ValueError as ex:
+                self._json = None, ex
+        parsed, error = self._json
+        if error is not None:
+            raise error
+        return parsed
+
     @property
     def status_code(self):
         """
@@ -89,6 +188,190 @@ class HTTPResponse:
         """
         return self._status_code
 
+    def is_blank(self):
+        """
+        Return `True` if response body is empty or only has whitespaces.
+        """
+        if not self._content.strip():
+            return True
+        # Whitespaces are single bytes except in UTF-16 and UTF-32.
+        charset = self._unicode_charset() or ""
+        if self._body is None and not charset.startswith(("utf-16", "utf-32")):
+            return False
+        return not self.body.strip()
+
+
+class StreamingHTTPResponse:
+    """
+    StreamingHTTPResponse reads body of a streamed request incrementally.
+    Chunks read are kept in a spooled file which is moved to a temporary
+    file on disk once it exceeds `spool_size`, so body can be iterated
+    more than once while memory in use stays bounded.
+
+    Iterating the response itself yields decoded text chunks, so it can be
+    passed directly as source to functions like `json_stream`.
+    """
+
+    def __init__(
+        self,
+        response,
+        chunk_size=None,
+        spool_size=None,
+        max_body_size=None,
+    ):
+        """
+        :param response: response returned by a `requests` request sent
+            with `stream=True`.
+        :param chunk_size: size in bytes of each chunk read from response,
+            `defaults.stream_chunk_size` if it's None.
+        :param spool_size: maximum size in bytes of body kept in memory,
+            `defaults.stream_spool_size` if it's None.
+        :param max_body_size: maximum size in bytes of body, `HTTPError`
+            is raised when reading beyond it. `defaults.stream_max_body_size`
+            if it's None, 0 means unlimited.
+        """
+        if chunk_size is None:
+            chunk_size = defaults.stream_chunk_size
+        if spool_size is None:
+            spool_size = defaults.stream_spool_size
+        if max_body_size is None:
+            max_body_size = defaults.stream_max_body_size
+        self._response = response
+        self._status_code = response.status_code
+        self._chunk_size = chunk_size
+        self._max_body_size = max_body_size
+        self._chunks = response.iter_content(chunk_size)
+        self._spool = tempfile.SpooledTemporaryFile(max_size=spool_size)
+        self._size = 0
+        self._exhausted = False
+        self._closed = False
+        self._body = None
+        self.charset = utils.get_encoding_from_headers(response.headers)
+        if self.charset is None:
+            self.charset = defaults.charset
+
+    @property
+    def header(self):
+        return self._response
+
+    @property
+    def headers(self):
+        return self._response.headers
+
+    @property
+    def status_code(self):
+        return self._status_code
+
+    def _read_chunk(self):
+        """Read next chunk from response and append it to spool.
+        Return `None` if the body ends."""
+        if self._exhausted:
+            return None
+        if self._closed:
+            raise HTTPError("HTTP Error response stream is closed")
+        try:
+            chunk = next(self._chunks, None)
+        except requests.exceptions.RequestException as err:
+            raise HTTPError(f"HTTP Error {err}") from err
+        if not chunk:
+            self._exhausted = True
+            return None
+        self._size += len(chunk)
+        if self._max_body_size and self._size > self._max_body_size:
+            self.close()
+            raise HTTPError(
+                f"HTTP Error response body exceeds {self._max_body_size} bytes"
+            )
+        self._spool.seek(0, 2)
+        self._spool.write(chunk)
+        return chunk
+
+    def iter_bytes(self):
+        """
+        Iterate body as `bytes` chunks.
+        """
+        position = 0
+        while True:
+            if position < self._size:
+                self._spool.seek(position)
+                chunk = self._spool.read(min(self._chunk_size, self._size - position))
+            else:
+                chunk = self._read_chunk()
+                if chunk is None:
+                    return
+            position += len(chunk)
+            yield chunk
+
+    def iter_text(self):
+        """
+        Iterate body as `str` chunks decoded incrementally with the charset
+        in response headers.
+        """
+        try:
+            decoder = codecs.getincrementaldecoder(self.charset)(errors="replace")
+        except LookupError:
+            _logger.warning(
+                "Unknown response charset=%s, decode it with utf-8", self.charset
+            )
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for chunk in self.iter_bytes():
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def __iter__(self):
+        return self.iter_text()
+
+    @property
+    def content(self):
+        """
+        Return whole response body as `bytes`.
+        """
+        for _ in self.iter_bytes():
+            pass
+        self._spool.seek(0)
+        return self._spool.read()
+
+    @property
+    def body(self):
+        """
+        Return whole response body as a `string`. It reads and holds whole
+        body in memory, iterate the response to avoid it.
+        :return: A `string`
+        """
+        if self._body is None:
+            self._body = ResponseBody("".join(self.iter_text()))
+        return self._body
+
+    def json(self):
+        """
+        Return response body parsed as JSON. The document is shared once
+        body is read, it must not be modified.
+        :return: A `dict` or `list` or other JSON value.
+        """
+        if self._body is not None:
+            return self._body.json()
+        return json.loads(self.content)
+
+    def is_blank(self):
+        """
+        Return `True` if response body is empty or only has whitespaces.
+        Only chunks before the first non-whitespace one are read.
+        """
+        return all(not chunk.strip() for chunk in self.iter_text())
+
+    def close(self):
+        """
+        Release the connection of response. Chunks already read are still
+        available until the response is dropped.
+        """
+        if not self._closed:
+            self._closed = True
+            self._response.close()
+
 
 def _make_prepare_url_func():
     """Expose prepare_url in `PreparedRequest`"""
@@ -181,16 +464,525 @@ def standardize_proxy_config(proxy_config):
     return standard_proxy_config
 
 
+class SessionPool:
+    """
+    SessionPool shares HTTP connections among all HTTP clients in process.
+    Each client keeps its own `requests.Session` so that cookies are not
+    shared, but sessions with the same proxy, verify and host mount the same
+    `HTTPAdapter` and reuse its connections. Adapters idle for longer than
+    `defaults.http_pool_idle_timeout` are closed.
+    """
+
+    def __init__(self):
+        self._adapters = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _prefix(url):
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}/".lower()
+
+    def _evict_idle(self, now):
+        expired = [
+            key
+            for key, (_, last_used) in self._adapters.items()
+            if now - last_used > defaults.http_pool_idle_timeout
+        ]
+        for key in expired:
+            adapter, _ = self._adapters.pop(key)
+            adapter.close()
+            self._evictions += 1
+
+    def adapter(self, proxies, verify, url):
+        """
+        Get the shared adapter for given proxies, verify and host of url.
+        :return: A `HTTPAdapter`
+        """
+        proxies = tuple(sorted((proxies or {}).items()))
+        key = (proxies, verify, self._prefix(url))
+        now = time.time()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._adapters.get(key)
+            if entry:
+                self._hits += 1
+                adapter = entry[0]
+            else:
+                self._misses += 1
+                adapter = HTTPAdapter(
+                    pool_connections=defaults.http_pool_connections,
+                    pool_maxsize=defaults.http_pool_maxsize,
+                )
+            self._adapters[key] = adapter, now
+        return adapter
+
+    def mount(self, session, url, verify):
+        """Mount the shared adapter for url to session."""
+        adapter = self.adapter(session.proxies, verify, url)
+        session.mount(self._prefix(url), adapter)
+
+    def stats(self):
+        """
+        Return statistics of the pool.
+        :return: A `dict` contains "hits", "misses", "evictions" and "size".
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "size": len(self._adapters),
+            }
+
+    def clear(self):
+        """Close all adapters in the pool."""
+        with self._lock:
+            for adapter, _ in self._adapters.values():
+                adapter.close()
+            self._adapters.clear()
+
+
+session_pool = SessionPool()
+
+
+def _get_retry_after(headers):
+    """Return seconds to wait in `Retry-After` header or `None`."""
+    value = (headers or {}).get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+class RetryPolicy:
+    """
+    RetryPolicy decides whether and when to retry a request by its response
+    status. The delay is an exponential backoff with jitter so that retries
+    of different jobs don't land at the same time, or the value of
+    `Retry-After` header if the server responds with it. A request is not
+    retried if `Retry-After` is longer than the maximum delay, since retrying
+    earlier than the server asks is throttled again.
+    """
+
+    def __init__(
+        self,
+        retries=None,
+        statuses=None,
+        backoff_factor=defaults.retry_backoff_factor,
+        max_delay=defaults.retry_max_delay,
+    ):
+        """
+        :param retries: maximum retry times, `defaults.retries` if it's None.
+        :param statuses: response statuses to retry,
+            `defaults.retry_statuses` if it's None.
+        :param backoff_factor: delay of the first retry in seconds, it's
+            doubled for each retry.
+        :param max_delay: maximum delay in seconds, the request is not
+            retried if the server asks to wait longer.
+        """
+        self.retries = max(defaults.retries if retries is None else retries, 0)
+        self.statuses = defaults.retry_statuses if statuses is None else statuses
+        self.backoff_factor = backoff_factor
+        self.max_delay = max_delay
+
+    def get_delay(self, attempt, status, headers=None):
+        """
+        Get the delay before retrying a request.
+        :param attempt: number of attempts made before, starts from 0.
+        :param status: response status of the last attempt.
+        :param headers: response headers of the last attempt.
+        :return: Delay in seconds or `None` if the request shouldn't retry.
+        """
+        if attempt >= self.retries or status not in self.statuses:
+            return None
+        delay = _get_retry_after(headers)
+        if delay is not None:
+            return delay if delay <= self.max_delay else None
+        backoff = self.backoff_factor * 2**attempt
+        delay = backoff / 2 + random.uniform(0, backoff / 2)
+        return min(delay, self.max_delay)
+
+
+class TokenBucket:
+    """
+    TokenBucket limits the rate of requests, each request takes a token
+    and tokens are refilled at `rate` per second up to `burst`. A request
+    which finds no token reserves one in advance and waits for it, so that
+    concurrent callers are spaced out in order.
+
+    If it's adaptive, the rate is adjusted by AIMD: it decreases by
+    `defaults.rate_limit_decrease_factor` when the host throttles requests
+    or responds slower than `latency_target`, and increases additively
+    by `defaults.rate_limit_increase` per second of successful requests,
+    within [`min_rate`, `max_rate`]. A `Retry-After` header pauses the
+    bucket for all callers regardless.
+    """
+
+    def __init__(
+        self,
+        rate,
+        burst=1,
+        adaptive=False,
+        min_rate=None,
+        max_rate=None,
+        latency_target=None,
+    ):
+        """
+        :param rate: requests allowed per second.
+        :param burst: maximum requests allowed at once.
+        :param adaptive: adjust rate by responses if it's True.
+        :param min_rate: minimum rate of adaptive bucket,
+            `defaults.rate_limit_min_rate` if it's None.
+        :param max_rate: maximum rate of adaptive bucket, `rate` if it's None.
+        :param latency_target: seconds of response latency which is treated
+            as congestion by adaptive bucket, ignored if it's None.
+        """
+        if rate <= 0:
+            raise ValueError(f"Rate limit must be positive: {rate}")
+        if burst < 1:
+            raise ValueError(f"Rate limit burst must be at least 1: {burst}")
+        self.burst = burst
+        self.adaptive = adaptive
+        self.min_rate = min(
+            defaults.rate_limit_min_rate if min_rate is None else min_rate, rate
+        )
+        self.max_rate = max(rate if max_rate is None else max_rate, rate)
+        self.latency_target = latency_target
+        self._rate = float(rate)
+        self._tokens = float(burst)
+        self._lock = threading.Lock()
+        now = time.monotonic()
+        self._updated = now
+        self._paused_until = now
+        self._increased = now
+        self._decreased = now - defaults.rate_limit_decrease_interval
+
+    @property
+    def rate(self):
+        """
+        Return the current rate of bucket.
+        :return: requests allowed per second.
+        """
+        return self._rate
+
+    def _refill(self, now):
+        elapsed = now - max(self._updated, self._paused_until)
+        if elapsed > 0:
+            self._tokens = min(self._tokens + elapsed * self._rate, self.burst)
+        self._updated = now
+
+    def reserve(self):
+        """
+        Take a token from bucket.
+        :return: Seconds to wait before the token can be used.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._refill(now)
+            self._tokens -= 1
+            delay = max(self._paused_until - now, 0)
+            if self._tokens < 0:
+                delay += -self._tokens / self._rate
+            return delay
+
+    def feedback(self, status, headers=None, latency=None):
+        """
+        Adjust bucket with response of a request sent.
+        :param status: response status.
+        :param headers: response headers.
+        :param latency: seconds taken by request.
+        """
+        retry_after = _get_retry_after(headers) if headers else None
+        now = time.monotonic()
+        with self._lock:
+            self._refill(now)
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            if not self.adaptive:
+                return
+            congested = status in defaults.rate_limit_throttle_statuses or (
+                self.latency_target is not None
+                and latency is not None
+                and latency > self.latency_target
+            )
+            if congested:
+                self._increased = now
+                # Responses of requests sent at the same time report the
+                # same congestion, decrease once for them.
+                if now - self._decreased >= defaults.rate_limit_decrease_interval:
+                    self._decreased = now
+                    self._rate = max(
+                        self._rate * defaults.rate_limit_decrease_factor,
+                        self.min_rate,
+                    )
+                    _logger.info("Rate limit is decreased to %.3f/s", self._rate)
+            elif status in defaults.success_statuses:
+                elapsed = min(now - self._increased, 1)
+                self._increased = now
+                self._rate = min(
+                    self._rate + defaults.rate_limit_increase * elapsed,
+                    self.max_rate,
+                )
+
+    def wait(self):
+        """Block until a token is available."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self):
+        """Wait in event loop until a token is available."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RateLimit:
+    """
+    RateLimit is the setting of a rate limit. Requests with the same key
+    share a `TokenBucket` process wide, the key is the host of request if
+    it's not given, or it can be a credential to limit per account.
+    """
+
+    def __init__(
+        self,
+        rate,
+        burst=1,
+        adaptive=False,
+        min_rate=None,
+        max_rate=None,
+        latency_target=None,
+        key=None,
+    ):
+        """
+        :param key: key of shared bucket, host of request url if it's None.
+        Other parameters are the same as `TokenBucket`.
+        """
+        if rate is None or rate <= 0:
+            raise ValueError(f'Rate limit "rate" expect to be positive: {rate}')
+        if burst < 1:
+            raise ValueError(f'Rate limit "burst" expect to be at least 1: {burst}')
+        self.rate = rate
+        self.burst = burst
+        self.adaptive = adaptive
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.latency_target = latency_target
+        self.key = key
+
+    @classmethod
+    def from_setting(cls, setting):
+        """
+        Construct a `RateLimit` from a rendered setting `dict` which values
+        may be strings, like the one in cc.json. Return `None` if the setting
+        has no rate.
+        """
+        if not setting or setting.get("rate") in (None, ""):
+            return None
+
+        def number(name):
+            value = setting.get(name)
+            if value in (None, ""):
+                return None
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f'Rate limit "{name}" expect to be a number: {value}')
+
+        return cls(
+            rate=number("rate"),
+            burst=number("burst") or 1,
+            adaptive=is_true(setting.get("adaptive", False)),
+            min_rate=number("min_rate"),
+            max_rate=number("max_rate"),
+            latency_target=number("latency_target"),
+            key=setting.get("key") or None,
+        )
+
+    def get_key(self, url):
+        return self.key or urlsplit(url).netloc.lower()
+
+    def create_bucket(self):
+        return TokenBucket(
+            self.rate,
+            self.burst,
+            self.adaptive,
+            self.min_rate,
+            self.max_rate,
+            self.latency_target,
+        )
+
+
+class RateLimiter:
+    """
+    RateLimiter keeps the token buckets shared by all clients in process.
+    A bucket is created by the first `RateLimit` with its key, later ones
+    with the same key share it.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, rate_limit, url):
+        """
+        Get the shared bucket of a rate limit for url.
+        :param rate_limit: `RateLimit` of request.
+        :param url: url of request.
+        :return: A `TokenBucket`
+        """
+        key = rate_limit.get_key(url)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = rate_limit.create_bucket()
+                    self._buckets[key] = bucket
+        return bucket
+
+    def clear(self):
+        """Drop all buckets."""
+        with self._lock:
+            self._buckets.clear()
+
+
+rate_limiter = RateLimiter()
+
+
+class CacheValidators:
+    """
+    CacheValidators keeps `ETag` and `Last-Modified` of GET responses by
+    url, so that later requests to the same url are sent conditionally
+    with `If-None-Match` and `If-Modified-Since`, and the server responds
+    304 without body if the resource is not modified.
+    """
+
+    _CONDITIONS = (("ETag", "If-None-Match"), ("Last-Modified", "If-Modified-Since"))
+
+    def __init__(self, validators=None, max_size=defaults.conditional_get_max_urls):
+        """
+        :param validators: validators by url loaded from checkpoint.
+        :param max_size: maximum urls kept, the least recently recorded
+            ones are dropped.
+        """
+        self._validators = dict(validators or {})
+        self._max_size = max_size
+        self.changed = False
+
+    def load(self, validators):
+        """Replace validators with the ones loaded from checkpoint."""
+        self._validators = dict(validators or {})
+        self.changed = False
+
+    def dump(self):
+        """
+        Return validators by url to be saved in checkpoint.
+        :return: A `dict`
+        """
+        return dict(self._validators)
+
+    def apply(self, url, method, headers):
+        """
+        Add conditions of url to request headers.
+        :return: Request headers with conditions
+        """
+        validators = self._validators.get(url)
+        if not validators or method.upper() != "GET":
+            return headers
+        headers = CaseInsensitiveDict(headers or {})
+        for validator, condition in self._CONDITIONS:
+            if validator in validators:
+                headers.setdefault(condition, validators[validator])
+        return headers
+
+    def record(self, url, method, response):
+        """
+        Record validators of a successful response to url. It should be
+        called after the response is processed, otherwise the content
+        would be skipped by following requests.
+        """
+        if method.upper() != "GET":
+            return
+        if response.status_code not in defaults.success_statuses:
+            return
+        headers = response.headers
+        validators = {
+            validator: headers[validator]
+            for validator, _ in self._CONDITIONS
+            if headers.get(validator)
+        }
+        if self._validators.get(url) == validators:
+            return
+        self._validators.pop(url, None)
+        if validators:
+            self._validators[url] = validators
+            while len(self._validators) > self._max_size:
+                del self._validators[next(iter(self._validators))]
+        self.changed = True
+
+
+def _log_retry(status, uri, method, delay):
+    _logger.warning(
+        "The response status=%s of request which url=%s and"
+        " method=%s. Retry after %.2f seconds.",
+        status,
+        uri,
+        method,
+        delay,
+    )
+
+
 class HttpClient:
-    def __init__(self, proxy_info=None, verify=True):
+    def __init__(
+        self,
+        proxy_info=None,
+        verify=True,
+        retry_policy=None,
+        stream=False,
+        rate_limit=None,
+        validators=None,
+        chunk_size=None,
+        spool_size=None,
+        max_body_size=None,
+    ):
         """
         Constructs a `HTTPRequest` with a optional proxy setting.
         :param proxy_info: a dictionary of proxy details. It could directly match the input signature
             of `requests` library, otherwise will be standardized and converted to match the input signature.
         :param verify: same as the `verify` parameter of requests.request() method
+        :param retry_policy: `RetryPolicy` of requests, a default one is used if it's None
+        :param stream: read body of successful responses incrementally, a
+            `StreamingHTTPResponse` is returned for them if it's True
+        :param rate_limit: `RateLimit` of requests, requests are not limited if it's None
+        :param validators: `CacheValidators` to send GET requests conditionally
+        :param chunk_size: size in bytes of each chunk read from a streamed
+            response, `defaults.stream_chunk_size` if it's None
+        :param spool_size: maximum size in bytes of a streamed body kept in
+            memory, `defaults.stream_spool_size` if it's None
+        :param max_body_size: maximum size in bytes of a streamed body,
+            `defaults.stream_max_body_size` if it's None, 0 means unlimited
         """
         self._connection = None
         self.requests_verify = verify
+        self.stream = stream
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limit = rate_limit
+        self.validators = validators
+        self.chunk_size = chunk_size
+        self.spool_size = spool_size
+        self.max_body_size = max_body_size
 
         if proxy_info:
             if isinstance(proxy_info, munch.Munch):
@@ -210,6 +1002,7 @@ class HttpClient:
 
     def _send_internal(self, uri, method, headers=None, body=None):
         """Do send request to target URL, validate SSL cert by default and return the response."""
+        session_pool.mount(self._connection, uri, self.requests_verify)
         return self._connection.request(
             url=uri,
             data=body,
@@ -217,52 +1010,74 @@ class HttpClient:
             headers=headers,
             timeout=defaults.timeout,
             verify=self.requests_verify,
+            stream=self.stream,
         )
 
-    def _retry_send_request_if_needed(self, uri, method="GET", headers=None, body=None):
-        """Invokes request and auto retry with an exponential backoff
-        if the response status is configured in defaults.retry_statuses."""
-        retries = max(defaults.retries, 0)
-        _logger.info("Invoking request to [%s] using [%s] method", uri, method)
-        for i in range(retries + 1):
-            try:
-                resp = self._send_internal(
-                    uri=uri, body=body, method=method, headers=headers
-                )
-                content = resp.content
-                response = resp
-            except requests.exceptions.SSLError as err:
-                _logger.error(
-                    "[SSL: CERTIFICATE_VERIFY_FAILED] certificate verification failed. "
-                    "The certificate of the https server [%s] is not trusted, "
-                    "You may need to check the certificate and "
-                    "refer to the documentation and add it to the trust list. %s",
-                    uri,
-                    traceback.format_exc(),
-                )
-                raise HTTPError(f"HTTP Error {err}") from err
-            except Exception as err:
-                _logger.exception(
-                    "Could not send request url=%s method=%s", uri, method
+    def get_bucket(self, url):
+        """
+        Get the shared `TokenBucket` which limits requests to url.
+        :return: A `TokenBucket` or `None` if requests are not limited.
+        """
+        if self.rate_limit is None:
+            return None
+        return rate_limiter.bucket(self.rate_limit, url)
+
+    def _send_once(self, uri, method="GET", headers=None, body=None):
+        """Invokes request once and wraps the response in `HTTPResponse`,
+        or `StreamingHTTPResponse` if it's successful in stream mode.
+        The rate limit bucket is adjusted with the response, the caller
+        should have waited on it."""
+        bucket = self.get_bucket(uri)
+        try:
+            start = time.monotonic()
+            resp = self._send_internal(
+                uri=uri, body=body, method=method, headers=headers
+            )
+            if bucket is not None:
+                bucket.feedback(
+                    resp.status_code, resp.headers, time.monotonic() - start
                 )
-                raise HTTPError(f"HTTP Error {err}") from err
-
-            status = resp.status_code
-
-            if self._is_need_retry(status, i, retries):
-                delay = 2**i
-                _logger.warning(
-                    "The response status=%s of request which url=%s and"
-                    " method=%s. Retry after %s seconds.",
-                    status,
-                    uri,
-                    method,
-                    delay,
+            if self.stream and resp.status_code in defaults.success_statuses:
+                return StreamingHTTPResponse(
+                    resp,
+                    chunk_size=self.chunk_size,
+                    spool_size=self.spool_size,
+                    max_body_size=self.max_body_size,
                 )
-                time.sleep(delay)
-                continue
+            content = resp.content
+        except requests.exceptions.SSLError as err:
+            _logger.error(
+                "[SSL: CERTIFICATE_VERIFY_FAILED] certificate verification failed. "
+                "The certificate of the https server [%s] is not trusted, "
+                "You may need to check the certificate and "
+                "refer to the documentation and add it to the trust list. %s",
+                uri,
+                traceback.format_exc(),
+            )
+            raise HTTPError(f"HTTP Error {err}") from err
+        except Exception as err:
+            _logger.exception("Could not send request url=%s method=%s", uri, method)
+            raise HTTPError(f"HTTP Error {err}") from err
+        return HTTPResponse(resp, content)
 
-            return HTTPResponse(response, content)
+    def _retry_send_request_if_needed(self, uri, method="GET", headers=None, body=None):
+        """Invokes request and auto retry with delays given by retry policy
+        if the response status is configured to retry. The calling thread
+        sleeps before each retry, `send_attempt` lets the caller schedule
+        retries instead."""
+        _logger.info("Invoking request to [%s] using [%s] method", uri, method)
+        bucket = self.get_bucket(uri)
+        for attempt in itertools.count():
+            if bucket is not None:
+                bucket.wait()
+            response = self._send_once(uri, method, headers, body)
+            delay = self.retry_policy.get_delay(
+                attempt, response.status_code, response.headers
+            )
+            if delay is None:
+                return response
+            _log_retry(response.status_code, uri, method, delay)
+            time.sleep(delay)
 
     def _prepare_url(self, url, params=None):
         self._url_preparer.prepare_url(url, params)
@@ -275,7 +1090,7 @@ class HttpClient:
             _logger.info("Proxy is not enabled for http connection.")
         self._connection = self._build_http_connection(self._proxy_info)
 
-    def send(self, request):
+    def _prepare_request(self, request):
         if not request:
             raise ValueError("The request is none")
         if request.body and not isinstance(request.body, str):
@@ -285,15 +1100,54 @@ class HttpClient:
             self._initialize_connection()
 
         try:
-            url = self._prepare_url(request.url)
+            return self._prepare_url(request.url)
         except Exception:
             _logger.warning(
                 "Failed to encode url=%s: %s", request.url, traceback.format_exc()
             )
-            url = request.url
+            return request.url
 
+    def _get_headers(self, request):
+        if self.validators is None:
+            return request.headers
+        return self.validators.apply(request.url, request.method, request.headers)
+
+    def send(self, request):
+        url = self._prepare_request(request)
         return self._retry_send_request_if_needed(
-            url, request.method, request.headers, request.body
+            url, request.method, self._get_headers(request), request.body
+        )
+
+    def send_attempt(self, request, attempt=0):
+        """
+        Send a request once after waiting on the bucket of its host. Unlike
+        `send`, it doesn't sleep for a retry but returns the delay, so that
+        the caller can schedule the retry instead of holding its thread.
+        :param attempt: number of attempts made before for the request.
+        :return: A tuple of `HTTPResponse` and delay in seconds before
+            retrying it, the delay is `None` if it shouldn't retry.
+        """
+        bucket = self.get_bucket(request.url)
+        if bucket is not None:
+            bucket.wait()
+        response = self.send_once(request)
+        delay = self.retry_policy.get_delay(
+            attempt, response.status_code, response.headers
+        )
+        if delay is not None:
+            _log_retry(response.status_code, request.url, request.method, delay)
+        return response, delay
+
+    def send_once(self, request):
+        """
+        Send a request without retry, the caller decides whether to retry
+        it with `retry_policy` and waits on the bucket of `get_bucket`.
+        :return: A `HTTPResponse`
+        """
+        url = self._prepare_request(request)
+        _logger.info("Invoking request to [%s] using [%s] method", url, request.method)
+        return self._send_once(
+            url, request.method, self._get_headers(request), request.body
         )
 
     @staticmethod
@@ -310,6 +1164,71 @@ class HttpClient:
         s.proxies = proxy_info or {}
         return s
 
-    @staticmethod
-    def _is_need_retry(status, retried, maximum_retries):
-        return retried < maximum_retries and status in defaults.retry_statuses
+
+class HostLimiter:
+    """
+    HostLimiter bounds the number of concurrent requests sent to each host
+    in an event loop.
+    """
+
+    def __init__(self, max_per_host=defaults.async_max_per_host):
+        self._max_per_host = max_per_host
+        self._semaphores = {}
+
+    def semaphore(self, url):
+        """
+        Get the semaphore of host of url, it must be used in the event loop
+        which the limiter is used in.
+        :return: A `asyncio.Semaphore`
+        """
+        host = urlsplit(url).netloc.lower()
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self._max_per_host)
+        return semaphore
+
+
+class AsyncHttpClient:
+    """
+    AsyncHttpClient is the coroutine counterpart of `HttpClient`. Requests
+    are sent with a `HttpClient` in executor so that the event loop is never
+    blocked, and concurrent requests to the same host are bounded by limiter.
+    It's not a non-blocking transport, each request holds a thread of the
+    executor until its response is read.
+    """
+
+    def __init__(self, http_client, executor=None, limiter=None):
+        """
+        :param http_client: `HttpClient` to send requests.
+        :param executor: executor to send requests in, the default executor
+            of event loop is used if it's `None`.
+        :param limiter: `HostLimiter` shared by clients in the event loop.
+        """
+        self._http_client = http_client
+        self._executor = executor
+        self._limiter = limiter or HostLimiter()
+
+    async def send(self, request):
+        """
+        Send a request same as `HttpClient.send`. Retries and rate limit
+        waits are scheduled on the event loop instead of sleeping in executor,
+        so neither the worker thread nor the host limiter is held meanwhile.
+        :return: A `HTTPResponse`
+        """
+        loop = asyncio.get_event_loop()
+        retry_policy = self._http_client.retry_policy
+        bucket = self._http_client.get_bucket(request.url)
+        for attempt in itertools.count():
+            if bucket is not None:
+                await bucket.wait_async()
+            async with self._limiter.semaphore(request.url):
+                response = await loop.run_in_executor(
+                    self._executor, self._http_client.send_once, request
+                )
+            delay = retry_policy.get_delay(
+                attempt, response.status_code, response.headers
+            )
+            if delay is None:
+                return response
+            _log_retry(response.status_code, request.url, request.method, delay)
+            await asyncio.sleep(delay)
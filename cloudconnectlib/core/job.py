@@ -13,15 +13,31 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import asyncio
+import itertools
 import threading
 
 from ..common import log
+from .context import Context
 from .exceptions import QuitJobError
-from .task import BaseTask
+from .task import BaseTask, CCESplitTask, RetryLater
 
 logger = log.get_cc_logger()
 
 
+def _perform(task, context):
+    contexts = task.perform(context) or ()
+    if not isinstance(task, CCESplitTask):
+        return list(contexts)
+    # Only the first split context is pulled here, which does the split, the
+    # others are pulled as jobs spawned for them are consumed.
+    contexts = iter(contexts)
+    first = next(contexts, None)
+    if first is None:
+        return ()
+    return itertools.chain((first,), contexts)
+
+
 class CCEJob:
     """
     One CCEJob is composed of a list of tasks. The task could be HTTP
@@ -34,7 +50,7 @@ class CCEJob:
     """
 
     def __init__(self, context, tasks=None):
-        self._context = context
+        self._context = Context.wrap(context)
         self._rest_tasks = []
 
         self._stop_signal_received = False
@@ -95,6 +111,8 @@ class CCEJob:
     def run(self):
         """
         Run current job, which executes tasks in it sequentially.
+        It yields jobs spawned for the rest tasks, or a `RetryLater` when a
+        task needs to retry requests, the job continues when it's resumed.
         """
         logger.debug("Start to run job")
 
@@ -108,11 +126,35 @@ class CCEJob:
         self._running_task = self._rest_tasks[0]
         self._rest_tasks = self._rest_tasks[1:]
 
+        count = 0
+        steps = ()
         try:
-            contexts = list(self._running_task.perform(self._context) or ())
+            perform = getattr(self._running_task, "perform_steps", None)
+            if perform is None:
+                perform = self._running_task.perform
+            steps = contexts = perform(self._context) or ()
+            # Contexts of split task are pulled lazily so that new jobs are
+            # only created as they are consumed, other tasks run to the end.
+            if not isinstance(self._running_task, CCESplitTask):
+                contexts = []
+                for step in steps:
+                    if isinstance(step, RetryLater):
+                        yield step
+                    else:
+                        contexts.append(step)
+            for ctx in contexts:
+                if self._check_if_stop_needed():
+                    return
+                if not self._rest_tasks:
+                    continue
+                count += 1
+                yield CCEJob(context=ctx, tasks=self._rest_tasks)
         except QuitJobError:
             logger.info("Quit job signal received, exiting job")
             return
+        finally:
+            if hasattr(steps, "close"):
+                steps.close()
 
         if self._check_if_stop_needed():
             return
@@ -121,15 +163,69 @@ class CCEJob:
             logger.info("No more task need to perform, exiting job")
             return
 
-        count = 0
+        logger.debug("Generated %s job in total", count)
+        logger.debug("Job execution finished successfully.")
+        self._stopped.set()
+
+    async def run_async(self, executor=None, limiter=None):
+        """
+        Coroutine version of `run`. Tasks which support `perform_async` are
+        performed in event loop, the others are performed in executor.
+        :param executor: executor to run blocking calls in.
+        :param limiter: `HostLimiter` to bound concurrent requests per host.
+        :return: An iterable of jobs spawned for the rest tasks, jobs of split
+            task are spawned lazily.
+        """
+        logger.debug("Start to run job")
+
+        if not self._rest_tasks:
+            logger.info("No task found in job")
+            return []
+
+        if self._check_if_stop_needed():
+            return []
+
+        self._running_task = self._rest_tasks[0]
+        self._rest_tasks = self._rest_tasks[1:]
 
-        for ctx in contexts:
-            count += 1
-            yield CCEJob(context=ctx, tasks=self._rest_tasks)
+        try:
+            perform_async = getattr(self._running_task, "perform_async", None)
+            if perform_async:
+                contexts = await perform_async(self._context, executor, limiter)
+            else:
+                contexts = await asyncio.get_event_loop().run_in_executor(
+                    executor, _perform, self._running_task, self._context
+                )
+        except QuitJobError:
+            logger.info("Quit job signal received, exiting job")
+            return []
 
-            if self._check_if_stop_needed():
-                break
+        if self._check_if_stop_needed():
+            return []
 
+        if not self._rest_tasks:
+            logger.info("No more task need to perform, exiting job")
+            return []
+
+        if isinstance(contexts, list):
+            jobs = [CCEJob(context=ctx, tasks=self._rest_tasks) for ctx in contexts]
+            logger.debug("Generated %s job in total", len(jobs))
+            logger.debug("Job execution finished successfully.")
+            self._stopped.set()
+            return jobs
+        return self._spawn_jobs(contexts)
+
+    def _spawn_jobs(self, contexts):
+        count = 0
+        try:
+            for ctx in contexts:
+                if self._check_if_stop_needed():
+                    return
+                count += 1
+                yield CCEJob(context=ctx, tasks=self._rest_tasks)
+        finally:
+            if hasattr(contexts, "close"):
+                contexts.close()
         logger.debug("Generated %s job in total", count)
         logger.debug("Job execution finished successfully.")
         self._stopped.set()
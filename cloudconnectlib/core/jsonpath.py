@@ -0,0 +1,110 @@
+#
+# Copyright 2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Evaluate simple JSONPATH expressions without jsonpath_ng object model."""
+from jsonpath_ng import Child, Fields, Root, Slice
+
+_NOT_SET = object()
+_ALL_ITEMS = Slice()
+
+
+class SimpleJSONPath:
+    """SimpleJSONPath evaluates a JSONPATH expression which only contains
+    root, child fields and "[*]" with a plain loop. The result is the same
+    as the jsonpath_ng expression it's created from."""
+
+    def __init__(self, expression, steps):
+        self._expression = expression
+        # Each step is a field name or `None` for "[*]"
+        self._steps = steps
+
+    @property
+    def expression(self):
+        return self._expression
+
+    def values(self, data):
+        """Return a `list` contains all values matched in data."""
+        values = [data]
+        for step in self._steps:
+            found = []
+            if step is None:
+                for value in values:
+                    found.extend(all_items(value))
+            else:
+                for value in values:
+                    try:
+                        value = value.get(step, _NOT_SET)
+                    except (TypeError, AttributeError):
+                        continue
+                    if value is not _NOT_SET:
+                        found.append(value)
+            values = found
+        return values
+
+    def __str__(self):
+        return str(self._expression)
+
+    def __repr__(self):
+        return f"SimpleJSONPath({self._expression!r})"
+
+
+def all_items(value):
+    """Return elements matched by "[*]" in value. Elements of a list are
+    returned as they are, other values are left to jsonpath_ng since how
+    they are matched differs across its versions, e.g. whether an empty
+    string or a float is treated as a single element list."""
+    if isinstance(value, list):
+        return value
+    return [match.value for match in _ALL_ITEMS.find(value)]
+
+
+def _collect_steps(expression, steps):
+    if isinstance(expression, Root):
+        return True
+    if isinstance(expression, Fields):
+        if len(expression.fields) != 1 or expression.fields[0] == "*":
+            return False
+        steps.append(expression.fields[0])
+        return True
+    if isinstance(expression, Slice):
+        if (expression.start, expression.end, expression.step) != (None,) * 3:
+            return False
+        steps.append(None)
+        return True
+    if isinstance(expression, Child):
+        return _collect_steps(expression.left, steps) and _collect_steps(
+            expression.right, steps
+        )
+    return False
+
+
+def simplify(expression):
+    """Create a `SimpleJSONPath` from a parsed jsonpath_ng expression.
+    :param expression: jsonpath_ng expression
+    :return: A `SimpleJSONPath` or `None` if expression contains other
+        operators like filter or recursive descent.
+    """
+    steps = []
+    if not _collect_steps(expression, steps):
+        return None
+    return SimpleJSONPath(expression, tuple(steps))
+
+
+def find_values(expression, data):
+    """Return a `list` contains all values matched by a compiled
+    expression in data."""
+    if isinstance(expression, SimpleJSONPath):
+        return expression.values(data)
+    return [match.value for match in expression.find(data)]
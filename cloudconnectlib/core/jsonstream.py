@@ -0,0 +1,294 @@
+#
+# Copyright 2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Incremental JSON extraction which reads values at a simple JSONPATH one
+by one from a stream, so that only a single value is kept in memory."""
+import codecs
+import json
+import re
+
+from .jsonpath import all_items
+
+_FIELD = r"[A-Za-z_]\w*"
+
+# This pattern matches the JSONPATH which can be evaluated incrementally,
+# like "$", "$[*]", "$.items[*]", "data.items[*]" or "$.data.next".
+_STREAMABLE_PATH = re.compile(
+    r"^(?:\$|\$\.{field}|{field})(?:\.{field})*(\[\*\])?$".format(field=_FIELD)
+)
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r"[,\]}\s]")
+
+# Consumed data is dropped from buffer once it reaches this size and half
+# of the buffer.
+_COMPACT_SIZE = 64 * 1024
+
+READ_SIZE = 64 * 1024  # size of each read from a file like source
+
+
+def parse_streamable_path(json_path_expr):
+    """Parse a JSONPATH expression which can be evaluated incrementally.
+    :param json_path_expr: JSONPATH expression.
+    :return: A tuple of field names and whether the path ends with
+        a wildcard "[*]", or `None` if the expression is not supported.
+    """
+    if not isinstance(json_path_expr, str):
+        return None
+    match = _STREAMABLE_PATH.match(json_path_expr.strip())
+    if not match:
+        return None
+    path = match.group(0)
+    wildcard = match.group(1) is not None
+    if wildcard:
+        path = path[:-3]
+    fields = tuple(field for field in path.split(".") if field and field != "$")
+    return fields, wildcard
+
+
+def _iter_chunks(source):
+    if isinstance(source, (str, bytes, bytearray)):
+        yield source
+    elif callable(getattr(source, "read", None)):
+        while True:
+            chunk = source.read(READ_SIZE)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        yield from source
+
+
+class _Reader:
+    """Reader holds the unconsumed part of stream as text."""
+
+    def __init__(self, chunks, charset):
+        self._chunks = chunks
+        self._decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Append next chunk to buffer. Return `False` if stream ends."""
+        if self._eof:
+            return False
+        for chunk in self._chunks:
+            if not isinstance(chunk, str):
+                chunk = self._decoder.decode(chunk)
+            if chunk:
+                self._buffer += chunk
+                return True
+        self._eof = True
+        tail = self._decoder.decode(b"", final=True)
+        if tail:
+            self._buffer += tail
+            return True
+        return False
+
+    def compact(self):
+        if self._pos >= _COMPACT_SIZE and self._pos * 2 >= len(self._buffer):
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+
+    def peek(self):
+        """Skip whitespaces and return next char or "" if stream ends."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            # all data in buffer is consumed
+            self._buffer, self._pos = "", 0
+            if not self._fill():
+                return ""
+
+    def consume(self, expected):
+        char = self.peek()
+        if char not in expected:
+            raise ValueError(
+                "Expecting one of '%s' but found '%s' at %s"
+                % (expected, char, self._pos)
+            )
+        self._pos += 1
+        return char
+
+    def _shift(self, index, parts):
+        """Drop data before index from buffer, it's appended to `parts` if
+        the value being scanned is kept."""
+        if parts is not None:
+            parts.append(self._buffer[self._pos : index])
+        self._buffer = self._buffer[index:]
+        self._pos = 0
+
+    def _take(self, end, parts):
+        text = None
+        if parts is not None:
+            parts.append(self._buffer[self._pos : end])
+            text = "".join(parts)
+        self._pos = end
+        return text
+
+    def _scan_value(self, keep):
+        """Move to the end of value which starts at current position and
+        return its text if `keep` is set. Scanned data is dropped from
+        buffer before reading more, so that a large value is not built by
+        repeated concatenation and a skipped one is not held in memory."""
+        if not self.peek():
+            raise ValueError("Unexpected end of JSON")
+        parts = [] if keep else None
+        index = self._pos
+        scalar = self._buffer[index] not in '[{"'
+        depth, in_string = 0, False
+        while True:
+            buffer = self._buffer
+            if scalar:
+                match = _SCALAR_END.search(buffer, index)
+                if match:
+                    return self._take(match.start(), parts)
+            elif in_string:
+                match = _STRING_SPECIAL.search(buffer, index)
+                if match and match.group() == "\\" and match.end() < len(buffer):
+                    # skip the escaped char
+                    index = match.end() + 1
+                    continue
+                if match and match.group() == '"':
+                    index, in_string = match.end(), False
+                    if depth == 0:
+                        return self._take(index, parts)
+                    continue
+                if match:
+                    index = match.start()
+            else:
+                match = _STRUCTURAL.search(buffer, index)
+                if match:
+                    index = match.end()
+                    char = match.group()
+                    if char == '"':
+                        in_string = True
+                    elif char in "[{":
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if depth == 0:
+                            return self._take(index, parts)
+                    continue
+            if not match:
+                index = len(buffer)
+            self._shift(index, parts)
+            index = 0
+            if not self._fill():
+                if scalar:
+                    return self._take(0, parts)
+                raise ValueError("Unexpected end of JSON")
+
+    def read_value(self):
+        return json.loads(self._scan_value(True))
+
+    def skip_value(self):
+        self._scan_value(False)
+
+    def locate(self, fields):
+        """Move to the value of object field path. Return `False` if it
+        doesn't exist."""
+        for field in fields:
+            if self.peek() != "{":
+                return False
+            self.consume("{")
+            if self.peek() == "}":
+                return False
+            while True:
+                key = self.read_value()
+                self.consume(":")
+                if key == field:
+                    break
+                self.skip_value()
+                if self.consume(",}") == "}":
+                    return False
+        return True
+
+
+def iter_json_path(source, json_path_expr, charset="utf-8"):
+    """Iterate values extracted with a simple JSONPATH expression from JSON
+    source incrementally. The result is the same as jsonpath_ng, e.g. for
+    "$.items[*]" each element of array "items" is yielded one by one.
+    :param source: JSON as `str` or `bytes`, a file like object or an
+        iterable of `str` or `bytes` chunks.
+    :param json_path_expr: JSONPATH expression accepted by
+        `parse_streamable_path`.
+    :param charset: charset to decode `bytes` chunks.
+    :return: A generator of extracted values.
+    """
+    path = parse_streamable_path(json_path_expr)
+    if path is None:
+        raise ValueError(
+            f'JSONPATH expression "{json_path_expr}" can not be evaluated '
+            "incrementally"
+        )
+    fields, wildcard = path
+    reader = _Reader(_iter_chunks(source), charset)
+
+    if not reader.locate(fields):
+        return
+    if not wildcard or reader.peek() != "[":
+        value = reader.read_value()
+        if wildcard:
+            yield from all_items(value)
+        else:
+            yield value
+        return
+    yield from _iter_array(reader)
+
+
+def iter_json_records(source, json_path_expr, charset="utf-8"):
+    """Iterate records of the value a simple JSONPATH expression without
+    wildcard matches, the same as extracting it with `json_path`: an array
+    is yielded element by element, any other value is yielded only if it's
+    not empty.
+    :param source: JSON as `str` or `bytes`, a file like object or an
+        iterable of `str` or `bytes` chunks.
+    :param json_path_expr: JSONPATH expression accepted by
+        `parse_streamable_path` which doesn't end with "[*]".
+    :param charset: charset to decode `bytes` chunks.
+    :return: A generator of extracted records.
+    """
+    path = parse_streamable_path(json_path_expr)
+    if path is None or path[1]:
+        raise ValueError(
+            f'JSONPATH expression "{json_path_expr}" can not be evaluated '
+            "incrementally as records"
+        )
+    reader = _Reader(_iter_chunks(source), charset)
+
+    if not reader.locate(path[0]):
+        return
+    if reader.peek() != "[":
+        value = reader.read_value()
+        if value:
+            yield value
+        return
+    yield from _iter_array(reader)
+
+
+def _iter_array(reader):
+    reader.consume("[")
+    if reader.peek() == "]":
+        return
+    while True:
+        reader.compact()
+        yield reader.read_value()
+        if reader.consume(",]") == "]":
+            return
@@ -19,29 +19,47 @@ import sys
 import traceback
 
 from ..common.log import get_cc_logger
+from .context import Context
 from .ext import lookup_method
 from .template import compile_template
 
 _logger = get_cc_logger()
 
+# A rendered value is only reused if variables are of these types, since
+# other values like a list could be modified in place without a new stamp.
+_IMMUTABLE_TYPES = (str, int, float, bool, bytes, type(None))
+
 
 class _Token:
     """Token class wraps a template expression"""
 
-    def __init__(self, source):
+    def __init__(self, source, native=False):
         """Constructs _Token from source. A rendered template
         will be created if source is string type because Jinja
-        template must be a string."""
+        template must be a string. If native is `True` the template
+        is rendered to native Python types rather than a string."""
         self._source = source
-        self._value_for = compile_template(source) if isinstance(source, str) else None
+        self._value_for = (
+            compile_template(source, native) if isinstance(source, str) else None
+        )
+        self._variables = getattr(self._value_for, "variables", None)
+        self._memo = None
 
     def render(self, variables):
         """Render value with variables if source is a string.
-        Otherwise return source directly."""
+        Otherwise return source directly. If variables is a `Context`,
+        the rendered value is reused until any variable referenced by
+        the template changes, unless any of them is a mutable value."""
         if self._value_for is None:
             return self._source
+        stamps = None
+        if self._variables is not None and isinstance(variables, Context):
+            stamps = variables.stamps(self._variables)
+            memo = self._memo
+            if memo is not None and memo[0] == stamps:
+                return memo[1]
         try:
-            return self._value_for(variables)
+            value = self._value_for(variables)
         except Exception as ex:
             _logger.warning(
                 'Unable to render template "%s". Please make sure template is'
@@ -51,7 +69,13 @@ class _Token:
                 ex,
                 traceback.format_exc(),
             )
-        return self._source
+            return self._source
+        if stamps is not None and all(
+            isinstance(variables.get(name), _IMMUTABLE_TYPES)
+            for name in self._variables
+        ):
+            self._memo = (stamps, value)
+        return value
 
 
 class DictToken:
@@ -13,15 +13,70 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import threading
+import time
+
 from solnlib.pattern import Singleton
 
+from . import defaults
+
 
 class PipeManager(metaclass=Singleton):
-    def __init__(self, event_writer=None):
+    def __init__(
+        self,
+        event_writer=None,
+        batch_size=defaults.pipe_batch_size,
+        flush_interval=defaults.pipe_flush_interval,
+    ):
         self._event_writer = event_writer
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        # Events are buffered for each thread, so that a thread only flushes
+        # and gets the result of writing its own events. Batching is per
+        # call: callers such as `std_output` flush their events before
+        # returning, nothing is left buffered for another thread to flush.
+        self._local = threading.local()
+        self._lock = threading.Lock()
 
     def write_events(self, events):
         if not self._event_writer:
             print(events, flush=True)
             return True
         return self._event_writer.write_events(events)
+
+    def _get_buffer(self):
+        local = self._local
+        if not hasattr(local, "buffer"):
+            local.buffer = []
+            local.last_flush = time.time()
+        return local
+
+    def buffer_events(self, events):
+        """Append events to the buffer of current thread which is flushed
+        once it's full or flush interval elapsed since last flush.
+        :param events: A `list` of events.
+        :return: `False` if the buffer is flushed but failed to write.
+        """
+        local = self._get_buffer()
+        local.buffer.extend(events)
+        if (
+            len(local.buffer) < self._batch_size
+            and time.time() - local.last_flush < self._flush_interval
+        ):
+            return True
+        return self.flush()
+
+    def flush(self):
+        """Write all events buffered by current thread in one batch.
+        :return: `False` if the event writer failed to write.
+        """
+        local = self._get_buffer()
+        events, local.buffer = local.buffer, []
+        local.last_flush = time.time()
+        if not events:
+            return True
+        with self._lock:
+            if not self._event_writer:
+                print("\n".join(map(str, events)), flush=True)
+                return True
+            return self._event_writer.write_events(events)
@@ -13,40 +13,122 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
-import copy
+import asyncio
+import itertools
 import threading
+import time
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 
 from cloudconnectlib.common.log import get_cc_logger
 from cloudconnectlib.core import defaults
 from cloudconnectlib.core.checkpoint import CheckpointManagerAdapter
+from cloudconnectlib.core.context import Context
 from cloudconnectlib.core.exceptions import (
     CCESplitError,
     HTTPError,
     QuitJobError,
     StopCCEIteration,
 )
-from cloudconnectlib.core.ext import lookup_method
-from cloudconnectlib.core.http import HttpClient, get_proxy_info
+from cloudconnectlib.core.ext import lookup_method, precompile_arguments
+from cloudconnectlib.core.http import (
+    AsyncHttpClient,
+    CacheValidators,
+    HttpClient,
+    RateLimit,
+    StreamingHTTPResponse,
+    get_proxy_info,
+)
 from cloudconnectlib.core.models import BasicAuthorization, DictToken, Request, _Token
 
 logger = get_cc_logger()
 
 _RESPONSE_KEY = "__response__"
 _AUTH_TYPES = {"basic_auth": BasicAuthorization}
+_DONE = object()
+
+
+def _close_response(response):
+    """Release the connection of a streamed response once it's processed."""
+    if isinstance(response, StreamingHTTPResponse):
+        response.close()
+
+
+class RetryLater:
+    """
+    RetryLater is yielded by `CCEHTTPRequestTask.perform_steps` when requests
+    need to retry, the caller resumes the task after `delay` seconds and is
+    free to run something else meanwhile.
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.due = time.monotonic() + delay
+
+    def __repr__(self):
+        return f"RetryLater({self.delay!r})"
+
+
+def _close_results(result):
+    """Release responses in a result of `_send_request` or a list of them."""
+    if isinstance(result, list):
+        for item in result:
+            _close_response(item[0])
+    elif result:
+        _close_response(result[0])
+
+
+def _is_not_modified(response):
+    return (
+        response is not None and response.status_code in defaults.not_modified_statuses
+    )
 
 
-class ProcessHandler:
-    def __init__(self, method, arguments, output):
+def _advance(steps, value):
+    """Send value to a generator and return what it yields next, or `_DONE`
+    if it's exhausted. StopIteration can't be raised through a future."""
+    try:
+        return steps.send(value)
+    except StopIteration:
+        return _DONE
+
+
+class _BoundFunction:
+    """A function call whose method is resolved and argument tokens are
+    built once when it's created."""
+
+    def __init__(self, method, arguments, native=False):
         self.method = method
-        self.arguments = [_Token(arg) for arg in arguments or ()]
+        self.arguments = tuple(
+            _Token(arg, native) for arg in precompile_arguments(method, arguments)
+        )
+        self._function = lookup_method(method)
+        if self._function is None:
+            # Pipeline plugins are registered when the engine starts, which
+            # is usually after tasks are configured
+            logger.debug(
+                'Method "%s" is not registered yet, it will be looked up again'
+                " when executed",
+                method,
+            )
+
+    def __call__(self, context):
+        function = self._function
+        if function is None:
+            # Pipeline plugins may be loaded after the task is configured
+            function = self._function = lookup_method(self.method)
+            if function is None:
+                raise ValueError(f"Unimplemented method: {self.method}")
+        return function(*[arg.render(context) for arg in self.arguments])
+
+
+class ProcessHandler(_BoundFunction):
+    def __init__(self, method, arguments, output, native=False):
+        super().__init__(method, arguments, native)
         self.output = output
 
     def execute(self, context):
-        args = [arg.render(context) for arg in self.arguments]
-        logger.debug("%s arguments found for method %s", len(args), self.method)
-        callable_method = lookup_method(self.method)
-        result = callable_method(*args)
+        result = self(context)
 
         data = {}
         if self.output:
@@ -55,27 +137,23 @@ class ProcessHandler:
         return data
 
 
-class Condition:
-    def __init__(self, method, arguments):
-        self.method = method
-        self.arguments = [_Token(arg) for arg in arguments or ()]
-
+class Condition(_BoundFunction):
     def is_meet(self, context):
-        args = [arg.render(context) for arg in self.arguments]
-        callable_method = lookup_method(self.method)
-        logger.debug("%s arguments found for method %s", len(args), self.method)
-        return callable_method(*args)
+        return self(context)
 
 
 class ConditionGroup:
     def __init__(self):
-        self._conditions = []
+        self._conditions = ()
 
     def add(self, condition):
-        self._conditions.append(condition)
+        self._conditions += (condition,)
 
     def is_meet(self, context):
-        return any(cdn.is_meet(context) for cdn in self._conditions)
+        for condition in self._conditions:
+            if condition(context):
+                return True
+        return False
 
 
 class ProxyTemplate:
@@ -87,6 +165,68 @@ class ProxyTemplate:
         return get_proxy_info(rendered)
 
 
+class RateLimitTemplate:
+    def __init__(self, rate_limit_setting):
+        self._rate_limit = DictToken(rate_limit_setting or {})
+
+    def render(self, context):
+        rendered = self._rate_limit.render(context)
+        return RateLimit.from_setting(rendered)
+
+
+class PageRange:
+    """
+    PageRange describes pagination by page number or offset. The page of
+    each request is a context variable referenced by request templates, and
+    the range of pages is known from the first response.
+    """
+
+    def __init__(self, name, total, mode, page_size, first, window):
+        self.name = name
+        self.mode = mode
+        self.window = window
+        self._total = _Token(total)
+        self._page_size = _Token(page_size)
+        self._first = first
+
+    @staticmethod
+    def _render_int(token, context, field):
+        value = token.render(context)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'Pagination "{field}" expect to be an integer: {value}')
+
+    def start(self, context):
+        """Set page of the first request if it's not in context."""
+        if context.get(self.name) in (None, ""):
+            context[self.name] = self._first
+
+    def step(self, context):
+        if self.mode == "page":
+            return 1
+        return self._render_int(self._page_size, context, "page_size")
+
+    def current(self, context):
+        return int(context[self.name])
+
+    def advance(self, context):
+        """Move the page in context to the next one."""
+        context[self.name] = self.current(context) + self.step(context)
+
+    def remaining(self, context):
+        """
+        Return the pages left from the current one. It's called after the
+        first response is processed so that total can be rendered from it.
+        :return: A `range` of pages.
+        """
+        step = self.step(context)
+        if step <= 0:
+            raise ValueError(f'Pagination "page_size" expect to be positive: {step}')
+        total = self._render_int(self._total, context, "total")
+        return range(self.current(context), self._first + total, step)
+
+
 class RequestTemplate:
     def __init__(self, request):
         if not request:
@@ -137,12 +277,14 @@ class RequestTemplate:
 class BaseTask:
     def __init__(self, name):
         self._name = name
-        self._pre_process_handler = []
-        self._post_process_handler = []
+        # Handlers are kept in tuples which are replaced when a new one is
+        # added so that a running task always iterates over a stable plan.
+        self._pre_process_handler = ()
+        self._post_process_handler = ()
         self._skip_pre_conditions = ConditionGroup()
         self._skip_post_conditions = ConditionGroup()
 
-    def add_preprocess_handler(self, method, input, output=None):
+    def add_preprocess_handler(self, method, input, output=None, native=False):
         """
         Add a preprocess handler. All handlers will be maintained and
         executed sequentially.
@@ -152,9 +294,12 @@ class BaseTask:
         :type input: ``list``
         :param output: The output variable name.
         :type output: ``string``
+        :param native: Render input templates to native Python types
+            rather than strings.
+        :type native: ``bool``
         """
-        handler = ProcessHandler(method, input, output)
-        self._pre_process_handler.append(handler)
+        handler = ProcessHandler(method, input, output, native)
+        self._pre_process_handler += (handler,)
 
     def add_preprocess_handler_batch(self, handlers):
         """
@@ -166,7 +311,7 @@ class BaseTask:
         for method, args, output in handlers:
             self.add_preprocess_handler(method, args, output)
 
-    def add_preprocess_skip_condition(self, method, input):
+    def add_preprocess_skip_condition(self, method, input, native=False):
         """
         Add a preprocess skip condition. The skip_conditions for preprocess
         defines a group of conditions and the relation of them is OR which
@@ -177,10 +322,13 @@ class BaseTask:
         :type method: ``string``
         :param input: The input of the method.
         :type input: ``list``
+        :param native: Render input templates to native Python types
+            rather than strings.
+        :type native: ``bool``
         """
-        self._skip_pre_conditions.add(Condition(method, input))
+        self._skip_pre_conditions.add(Condition(method, input, native))
 
-    def add_postprocess_handler(self, method, input, output=None):
+    def add_postprocess_handler(self, method, input, output=None, native=False):
         """
         Add a postprocess handler. All handlers will be maintained and
         executed sequentially.
@@ -190,9 +338,12 @@ class BaseTask:
         :type input: ``list``
         :param output: The output variable name.
         :type output: ``string``
+        :param native: Render input templates to native Python types
+            rather than strings.
+        :type native: ``bool``
         """
-        handler = ProcessHandler(method, input, output)
-        self._post_process_handler.append(handler)
+        handler = ProcessHandler(method, input, output, native)
+        self._post_process_handler += (handler,)
 
     def add_postprocess_handler_batch(self, handlers):
         """
@@ -204,7 +355,7 @@ class BaseTask:
         for method, args, output in handlers:
             self.add_postprocess_handler(method, args, output)
 
-    def add_postprocess_skip_condition(self, method, input):
+    def add_postprocess_skip_condition(self, method, input, native=False):
         """
         Add a preprocess skip condition. The skip_conditions for postprocess
         defines a group of conditions and the relation of them is OR which means
@@ -215,8 +366,11 @@ class BaseTask:
         :type method: ``string``
         :param input: The input of the method.
         :type input: ``list``
+        :param native: Render input templates to native Python types
+            rather than strings.
+        :type native: ``bool``
         """
-        self._skip_post_conditions.add(Condition(method, input))
+        self._skip_post_conditions.add(Condition(method, input, native))
 
     @staticmethod
     def _execute_handlers(skip_conditions, handlers, context, phase):
@@ -228,10 +382,9 @@ class BaseTask:
             return
 
         for handler in handlers:
-            data = handler.execute(context)
-            if data:
-                # FIXME
-                context.update(data)
+            result = handler(context)
+            if handler.output:
+                context[handler.output] = result
             if context.get("is_token_refreshed"):
                 # In case of OAuth flow after refreshing access token retrying again with the query to collect records
                 logger.info(
@@ -264,6 +417,19 @@ class BaseTask:
         return self.__str__()
 
 
+def _batch_results(results, batch_size):
+    """Merge every `batch_size` split results into one in which values of
+    the same key are collected into a list."""
+    while True:
+        batch = {}
+        for result in itertools.islice(results, batch_size):
+            for key, value in result.items():
+                batch.setdefault(key, []).append(value)
+        if not batch:
+            return
+        yield batch
+
+
 class CCESplitTask(BaseTask):
     OUTPUT_KEY = "__cce_split_result__"
 
@@ -271,16 +437,31 @@ class CCESplitTask(BaseTask):
         super().__init__(name)
         self._process_handler = None
         self._source = None
+        self._batch_size = None
 
-    def configure_split(self, method, source, output, separator=None):
+    def configure_split(self, method, source, output, separator=None, batch_size=None):
+        """
+        Configure how to split source into multiple contexts.
+
+        :param method: split method name.
+        :param source: template of the source to split.
+        :param output: variable name of each split value.
+        :param separator: separator to split a string source.
+        :param batch_size: number of split values handled by each context,
+            `output` is a list of values if it's set.
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"Invalid split batch size: {batch_size}")
         arguments = [source, output, separator]
         self._source = source
+        self._batch_size = batch_size
         self._process_handler = ProcessHandler(
             method, arguments, CCESplitTask.OUTPUT_KEY
         )
 
     def perform(self, context):
         logger.debug("Task=%s start to run", self)
+        context = Context.wrap(context)
         try:
             self._pre_process(context)
         except StopCCEIteration:
@@ -299,8 +480,19 @@ class CCESplitTask(BaseTask):
             raise CCESplitError
         if not invoke_results or not invoke_results.get(CCESplitTask.OUTPUT_KEY):
             raise CCESplitError
-        for invoke_result in invoke_results[CCESplitTask.OUTPUT_KEY]:
-            new_context = copy.deepcopy(context)
+        # Split results are consumed lazily, peek the first one to make sure
+        # there is at least one.
+        results = iter(invoke_results[CCESplitTask.OUTPUT_KEY])
+        first = next(results, None)
+        if first is None:
+            raise CCESplitError
+        results = itertools.chain((first,), results)
+        if self._batch_size:
+            results = _batch_results(results, self._batch_size)
+
+        for invoke_result in results:
+            # All split contexts share the current one instead of copying it
+            new_context = context.fork()
             new_context.update(invoke_result)
             yield new_context
 
@@ -328,11 +520,35 @@ class CCEHTTPRequestTask(BaseTask):
             To handle status code using custom logic, return (response, bool).
                 Bool decides whether to break or continue the code flow
         :type custom_func: ``function``
+        :param stream: Read body of successful responses incrementally. The
+            response in context is a `StreamingHTTPResponse` which can be
+            passed to post-process functions like `json_stream` directly.
+        :type stream: ``bool``
+        :param chunk_size: Size in bytes of each chunk read from a streamed
+            response, `defaults.stream_chunk_size` if it's not set.
+        :type chunk_size: ``int``
+        :param spool_size: Maximum size in bytes of a streamed body kept in
+            memory before it's spooled to a temporary file,
+            `defaults.stream_spool_size` if it's not set.
+        :type spool_size: ``int``
+        :param max_body_size: Maximum size in bytes of a streamed body, the
+            response is rejected once it's exceeded. 0 means unlimited,
+            `defaults.stream_max_body_size` if it's not set.
+        :type max_body_size: ``int``
+        :param conditional_get: Send GET requests with `If-None-Match` and
+            `If-Modified-Since` built from `ETag` and `Last-Modified` of the
+            last processed response to the same url. They are saved with
+            checkpoint if it's configured. A 304 response to the first
+            request ends the task as no new data, a page which is not
+            modified is skipped.
+        :type conditional_get: ``bool``
         """
         super().__init__(name)
         self._request = RequestTemplate(request)
         self._stop_conditions = ConditionGroup()
         self._proxy_info = None
+        self._rate_limit = None
+        self._page_range = None
         self._max_iteration_count = defaults.max_iteration_count
 
         self._checkpointer = None
@@ -346,6 +562,12 @@ class CCEHTTPRequestTask(BaseTask):
         if kwargs.get("custom_func"):
             self.custom_handle_status_code = kwargs["custom_func"]
         self.requests_verify = kwargs.get("verify", True)
+        self.stream = kwargs.get("stream", False)
+        self._stream_options = {
+            key: kwargs.get(key)
+            for key in ("chunk_size", "spool_size", "max_body_size")
+        }
+        self._conditional_get = kwargs.get("conditional_get", False)
 
     def stop(self, block=False, timeout=30):
         """
@@ -385,6 +607,25 @@ class CCEHTTPRequestTask(BaseTask):
         """
         self._proxy_info = ProxyTemplate(proxy_setting)
 
+    def set_rate_limit(self, rate_limit_setting):
+        """
+        Setup the rate limit of requests. Tasks with the same key share the
+        limit process wide, so the total rate of them is bounded.
+
+        :param rate_limit_setting: Rate limit setting could include the
+            following fields and contain jinja2 template
+            "rate": requests allowed per second,
+            "burst": maximum requests allowed at once, defaults to 1,
+            "adaptive": adjust rate by throttled responses and latency,
+            "min_rate": minimum rate when adaptive,
+            "max_rate": maximum rate when adaptive, defaults to rate,
+            "latency_target": seconds of latency treated as congestion,
+            "key": key of the shared limit like a credential,
+                defaults to host of request url,
+        :type rate_limit_setting: ``dict``
+        """
+        self._rate_limit = RateLimitTemplate(rate_limit_setting)
+
     def set_auth(self, auth_type, settings):
         """
         Set the authentication of HTTP request.
@@ -403,6 +644,59 @@ class CCEHTTPRequestTask(BaseTask):
             raise ValueError(f"Unsupported auth type={auth_type}")
         self._authorizer = authorizer_cls(settings)
 
+    def configure_pagination(
+        self,
+        name,
+        total,
+        mode="page",
+        page_size=None,
+        first=None,
+        window=defaults.pagination_window,
+    ):
+        """
+        Fetch pages concurrently for APIs paginated by page number or
+        offset. The first request is sent as usual, then the range of pages
+        is rendered from context after its post-process, and the following
+        pages are fetched `window` at a time. Responses are post-processed
+        one by one in order of pages, and checkpoint is persisted after each
+        of them, so it never skips a page which is not processed.
+
+        Pages after the first are rendered from the request of task with
+        the page variable set, pre-process runs only before the first.
+        After a page is processed the page variable is advanced to the next
+        page, so that a checkpoint containing it resumes from there.
+
+        :param name: name of the context variable which request templates
+            take page number or offset from, like "{{page}}".
+        :type name: ``string``
+        :param total: number of pages in "page" mode or number of items in
+            "offset" mode. It could contain jinja2 template.
+        :type total: ``string or integer``
+        :param mode: "page" or "offset".
+        :type mode: ``string``
+        :param page_size: number of items in a page, required in "offset"
+            mode. It could contain jinja2 template.
+        :type page_size: ``string or integer``
+        :param first: the first page number or offset, default to 1 in
+            "page" mode and 0 in "offset" mode.
+        :type first: ``integer``
+        :param window: number of pages fetched concurrently.
+        :type window: ``integer``
+        """
+        if not name or not name.strip():
+            raise ValueError(f'Invalid pagination variable name: "{name}"')
+        if mode not in ("page", "offset"):
+            raise ValueError(f"Unsupported pagination mode: {mode}")
+        if mode == "offset" and page_size is None:
+            raise ValueError("Page size is required in offset pagination mode")
+        if window < 1:
+            raise ValueError(f"Pagination window must be at least 1: {window}")
+        if first is None:
+            first = 1 if mode == "page" else 0
+        self._page_range = PageRange(
+            name.strip(), total, mode, page_size, int(first), int(window)
+        )
+
     def set_iteration_count(self, count):
         """
         Set the maximum loop count for the request. The request will ignore
@@ -422,7 +716,7 @@ class CCEHTTPRequestTask(BaseTask):
                 self._max_iteration_count,
             )
 
-    def add_stop_condition(self, method, input):
+    def add_stop_condition(self, method, input, native=False):
         """
         Add a stop condition. The stop_conditions is a group of conditions
          which defines when the request loop should be stopped and the
@@ -433,8 +727,11 @@ class CCEHTTPRequestTask(BaseTask):
         :type method: ``string``
         :param input: The input of the method.
         :type input: ``list``
+        :param native: Render input templates to native Python types
+            rather than strings.
+        :type native: ``bool``
         """
-        self._stop_conditions.add(Condition(method, input))
+        self._stop_conditions.add(Condition(method, input, native))
 
     def configure_checkpoint(self, name, content):
         """
@@ -464,22 +761,82 @@ class CCEHTTPRequestTask(BaseTask):
             return True
         return False
 
-    def _send_request(self, request):
+    def _send_request(self, request, attempt=0):
+        """
+        Send a request once.
+        :param attempt: number of attempts made before for the request.
+        :return: A `RetryLater` if it needs to retry, otherwise a tuple of
+            response and whether the task should exit.
+        """
         try:
-            response = self._http_client.send(request)
+            response, delay = self._http_client.send_attempt(request, attempt)
         except HTTPError as error:
-            logger.exception(
-                "Error occurred in request url=%s method=%s reason=%s",
+            return self._handle_send_error(request, error)
+        if delay is not None and not self._check_if_stop_needed():
+            _close_response(response)
+            return RetryLater(delay)
+        return self._handle_response(request, response)
+
+    def _send_requests(self, requests, executor=None):
+        """
+        Send requests, concurrently in executor if it's given. Requests which
+        need to retry are sent again after yielding a `RetryLater`.
+        :return: A `list` of results of `_send_request` in the same order.
+        """
+        results = [None] * len(requests)
+        pending = list(range(len(requests)))
+        for attempt in itertools.count():
+
+            def send(request):
+                if attempt:
+                    return self._send_request(request, attempt)
+                return self._send_request(request)
+
+            batch = [requests[i] for i in pending]
+            if executor is None:
+                sent = [send(request) for request in batch]
+            else:
+                sent = list(executor.map(send, batch))
+            retries = []
+            for i, result in zip(pending, sent):
+                if isinstance(result, RetryLater):
+                    retries.append((i, result.delay))
+                else:
+                    results[i] = result
+            if not retries:
+                return results
+            yield RetryLater(max(delay for _, delay in retries))
+            pending = [i for i, _ in retries]
+            if self._check_if_stop_needed():
+                for i in pending:
+                    results[i] = None, True
+                return results
+
+    @staticmethod
+    def _handle_send_error(request, error):
+        logger.exception(
+            "Error occurred in request url=%s method=%s reason=%s",
+            request.url,
+            request.method,
+            error.reason,
+        )
+        return None, True
+
+    def _handle_response(self, request, response):
+        status = response.status_code
+
+        if status in defaults.not_modified_statuses:
+            logger.info(
+                "The resource of request which url=%s and method=%s is not"
+                " modified, status=%s.",
                 request.url,
                 request.method,
-                error.reason,
+                status,
             )
-            return None, True
-
-        status = response.status_code
+            return response, True
 
         if status in defaults.success_statuses:
-            if not (response.body or "").strip():
+            if response.is_blank():
                 logger.info(
                     "The response body of request which url=%s and"
                     " method=%s is empty, status=%s.",
@@ -507,39 +864,58 @@ class CCEHTTPRequestTask(BaseTask):
 
         return response, True
 
-    def _persist_checkpoint(self, context):
+    def _persist_checkpoint(self, context, validators=None):
         if not self._checkpointer:
             logger.debug("Checkpoint is not configured. Skip persisting checkpoint.")
             return
         try:
             self._checkpointer.save(context)
+            if validators is not None and validators.changed:
+                self._checkpointer.save_validators(context, validators.dump())
+                validators.changed = False
         except Exception:
             logger.exception("Error while persisting checkpoint")
         else:
             logger.debug("Checkpoint has been updated successfully.")
 
-    def _load_checkpoint(self, ctx):
+    def _load_checkpoint(self, ctx, validators=None):
         if not self._checkpointer:
             logger.debug("Checkpoint is not configured. Skip loading checkpoint.")
             return {}
+        if validators is not None:
+            validators.load(self._checkpointer.load_validators(ctx))
         return self._checkpointer.load(ctx=ctx)
 
     def _prepare_http_client(self, ctx):
         proxy = self._proxy_info.render(ctx) if self._proxy_info else None
-        self._http_client = HttpClient(proxy, self.requests_verify)
+        rate_limit = self._rate_limit.render(ctx) if self._rate_limit else None
+        self._http_client = HttpClient(
+            proxy,
+            self.requests_verify,
+            stream=self.stream,
+            rate_limit=rate_limit,
+            **self._stream_options,
+        )
 
     def _flush_checkpoint(self):
         if self._checkpointer:
             # Flush checkpoint cache to disk
             self._checkpointer.close()
 
-    def perform(self, context):
-        logger.info("Starting to perform task=%s", self)
-
+    def _iter_requests(self, context):
+        """
+        Run the request loop of task. It yields each request to send and
+        expects the result of `_send_request` sent back. A `list` of
+        requests could be yielded to send concurrently, a `list` of results
+        in the same order is expected then.
+        """
         self._prepare_http_client(context)
         done_count = 0
+        # Validators are kept for each perform since split contexts are
+        # performed concurrently by the same task.
+        validators = CacheValidators() if self._conditional_get else None
 
-        context.update(self._load_checkpoint(context))
+        context.update(self._load_checkpoint(context, validators))
         update_source = False if context.get("source") else True
         self._request.reset()
 
@@ -556,45 +932,200 @@ class CCEHTTPRequestTask(BaseTask):
             if self._check_if_stop_needed():
                 break
 
-            r = self._request.render(context)
-            if self._authorizer:
-                self._authorizer(r.headers, context)
+            if self._page_range is not None:
+                self._page_range.start(context)
+            r = self._render_request(context, validators)
 
-            response, need_exit = self._send_request(r)
-            context[_RESPONSE_KEY] = response
+            response, need_exit = yield r
+            if not self._process_response(
+                context, r, response, need_exit, update_source, validators
+            ):
+                break
 
-            if need_exit:
-                logger.info(
-                    "Task=%s need been terminated due to request response", self
-                )
+            done_count += 1
+            if self._should_exit(done_count, context):
                 break
-            if self._check_if_stop_needed():
+            if self._page_range is not None:
+                yield from self._iter_pages(
+                    context, done_count, update_source, validators
+                )
                 break
+        if update_source and context.get("source"):
+            del context["source"]
 
-            if update_source:
-                context["source"] = r.url.split("?")[0]
+    def _render_request(self, context, validators=None):
+        r = self._request.render(context)
+        if self._authorizer:
+            self._authorizer(r.headers, context)
+        if validators is not None:
+            r.headers = validators.apply(r.url, r.method, r.headers)
+        return r
+
+    def _process_response(
+        self, context, r, response, need_exit, update_source, validators=None
+    ):
+        """
+        Post-process a response and persist checkpoint.
+        :return: `False` if the task should stop.
+        """
+        context[_RESPONSE_KEY] = None if _is_not_modified(response) else response
 
-            try:
-                self._post_process(context)
-            except StopCCEIteration:
-                logger.info("Task=%s exits in post_process stage", self)
-                break
-            except QuitJobError:
-                self._flush_checkpoint()
-                raise
+        if need_exit:
+            logger.info("Task=%s need been terminated due to request response", self)
+            return False
+        if self._check_if_stop_needed():
+            return False
 
-            self._persist_checkpoint(context)
+        if update_source:
+            context["source"] = r.url.split("?")[0]
 
-            if self._check_if_stop_needed():
-                break
+        try:
+            self._post_process(context)
+        except StopCCEIteration:
+            logger.info("Task=%s exits in post_process stage", self)
+            return False
+        except QuitJobError:
+            self._flush_checkpoint()
+            raise
 
-            done_count += 1
-            if self._should_exit(done_count, context):
-                break
-        if update_source and context.get("source"):
-            del context["source"]
-        yield context
+        if validators is not None:
+            validators.record(r.url, r.method, response)
+        if self._page_range is not None:
+            self._page_range.advance(context)
+        self._persist_checkpoint(context, validators)
+
+        return not self._check_if_stop_needed()
+
+    def _iter_pages(self, context, done_count, update_source, validators=None):
+        """
+        Yield requests of remaining pages in lists of window size, and
+        process the responses sent back in order.
+        """
+        try:
+            pages = iter(self._page_range.remaining(context))
+        except ValueError as ex:
+            logger.warning("Task=%s cannot get range of pages: %s", self, ex)
+            return
+        if self._max_iteration_count > 0:
+            pages = itertools.islice(pages, self._max_iteration_count - done_count)
+        name = self._page_range.name
 
+        while True:
+            window = list(itertools.islice(pages, self._page_range.window))
+            if not window:
+                return
+            batch = []
+            for page in window:
+                page_context = context.fork()
+                page_context[name] = page
+                batch.append(self._render_request(page_context, validators))
+            logger.debug("Task=%s fetches pages %s", self, window)
+
+            results = yield batch
+            for page, r, (response, need_exit) in zip(window, batch, results):
+                context[name] = page
+                if _is_not_modified(response):
+                    # Only the page is not modified, go on with the next one
+                    logger.info("Task=%s skips page %s not modified", self, page)
+                    self._page_range.advance(context)
+                    self._persist_checkpoint(context, validators)
+                elif not self._process_response(
+                    context, r, response, need_exit, update_source, validators
+                ):
+                    return
+                done_count += 1
+                if self._should_exit(done_count, context):
+                    return
+
+    def _finish(self):
         self._stopped.set()
         self._flush_checkpoint()
         logger.info("Perform task=%s finished", self)
+
+    def perform(self, context):
+        for step in self.perform_steps(context):
+            if isinstance(step, RetryLater):
+                time.sleep(step.delay)
+            else:
+                yield step
+
+    def perform_steps(self, context):
+        """
+        Same as `perform` except that a `RetryLater` is yielded instead of
+        sleeping when requests need to retry, the task continues when it's
+        resumed.
+        """
+        logger.info("Starting to perform task=%s", self)
+
+        # Changes are written through to the original context, wrap it to
+        # let templates reuse rendered values across pages.
+        context = Context.wrap(context)
+        requests = self._iter_requests(context)
+        executor = None
+        try:
+            request = next(requests)
+            while True:
+                if isinstance(request, list):
+                    if executor is None:
+                        executor = ThreadPoolExecutor(self._page_range.window)
+                    result = yield from self._send_requests(request, executor)
+                else:
+                    result = (yield from self._send_requests([request]))[0]
+                try:
+                    request = requests.send(result)
+                finally:
+                    _close_results(result)
+        except StopIteration:
+            pass
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        yield context
+
+        self._finish()
+
+    async def perform_async(self, context, executor=None, limiter=None):
+        """
+        Coroutine version of `perform`. Requests are sent with
+        `AsyncHttpClient` and pipeline functions run in executor.
+        :param context: context to perform the task with.
+        :param executor: executor to run blocking calls in, the default
+            executor of event loop is used if it's `None`.
+        :param limiter: `HostLimiter` to bound concurrent requests per host.
+        :return: A `list` contains the context.
+        """
+        logger.info("Starting to perform task=%s", self)
+        loop = asyncio.get_event_loop()
+        context = Context.wrap(context)
+        requests = self._iter_requests(context)
+        client = None
+        result = None
+        while True:
+            try:
+                request = await loop.run_in_executor(
+                    executor, _advance, requests, result
+                )
+            finally:
+                _close_results(result)
+            if request is _DONE:
+                break
+            if client is None:
+                client = AsyncHttpClient(self._http_client, executor, limiter)
+            if isinstance(request, list):
+                result = list(
+                    await asyncio.gather(
+                        *(self._send_request_async(client, r) for r in request)
+                    )
+                )
+            else:
+                result = await self._send_request_async(client, request)
+
+        await loop.run_in_executor(executor, self._finish)
+        return [context]
+
+    async def _send_request_async(self, client, request):
+        try:
+            response = await client.send(request)
+        except HTTPError as error:
+            return self._handle_send_error(request, error)
+        return self._handle_response(request, response)
@@ -13,24 +13,258 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import os
+import os.path as op
 import re
+import tempfile
+from functools import lru_cache
 
-from jinja2 import Template
+from jinja2 import BaseLoader, Environment, FileSystemBytecodeCache, meta, nodes
+from jinja2.exceptions import UndefinedError
+from jinja2.nativetypes import NativeEnvironment
+
+from .. import __version__
+from ..common.log import get_cc_logger
+from . import defaults
+
+_logger = get_cc_logger()
 
 # This pattern matches the template with only one token inside like "{{
 # token1}}", "{{ token2 }"
 PATTERN = re.compile(r"^\{\{\s*(\w+)\s*\}\}$")
 
+# This pattern matches the template with only one dotted path inside like
+# "{{__response__.body}}", "{{ __response__.headers.link }}"
+PATH_PATTERN = re.compile(r"^\{\{\s*(\w+(?:\.[A-Za-z_]\w*)+)\s*\}\}$")
+
+# Markers which make a string to be a Jinja2 template rather than a literal.
+_JINJA_MARKERS = ("{{", "{%", "{#")
+
+# Templates which use these globals or filters render a different value
+# each time even if variables they reference don't change.
+_VOLATILE_NAMES = frozenset(("cycler", "joiner", "lipsum", "random"))
+
+_undefined = object()
+
+_NEWLINE = re.compile(r"\r\n?")
+
+# Folder under the cache directory which holds compiled template bytecode.
+BYTECODE_CACHE_FOLDER = "cce_template_cache"
+
+
+class _SourceLoader(BaseLoader):
+    """A loader which treats the template name as the template source, so
+    that templates compiled from strings go through the bytecode cache."""
+
+    def __init__(self, filename=None):
+        # Filename is part of bytecode cache key, it keeps the bytecode
+        # compiled by different environments apart.
+        self._filename = filename
+
+    def get_source(self, environment, template):
+        return template, self._filename, lambda: True
+
+
+class _BytecodeCache(FileSystemBytecodeCache):
+    """A file system bytecode cache which never fails template compiling.
+    Cache files are written to a temporary file and renamed in place, so
+    that they can be shared between modular input processes without being
+    read half written. An unreadable, corrupt or unwritable cache file just
+    results in compiling the template again."""
+
+    def load_bytecode(self, bucket):
+        try:
+            super().load_bytecode(bucket)
+        except Exception as ex:
+            _logger.warning("Unable to load template bytecode: %s", ex)
+            bucket.reset()
+
+    def dump_bytecode(self, bucket):
+        # Jinja2 2.x writes cache files in place, do it the same way for all
+        # versions.
+        filename = self._get_cache_filename(bucket)
+        temp_file = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                mode="wb",
+                dir=op.dirname(filename),
+                prefix=op.basename(filename),
+                suffix=".tmp",
+                delete=False,
+            ) as f:
+                temp_file = f.name
+                bucket.write_bytecode(f)
+            os.replace(temp_file, filename)
+        except Exception as ex:
+            _logger.warning("Unable to dump template bytecode: %s", ex)
+            if temp_file and op.exists(temp_file):
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+
+
+# Environment shared by all templates, compiled templates are cached by
+# compile_template so the environment itself doesn't keep them.
+_environment = Environment(loader=_SourceLoader(), cache_size=0)
+_native_environment = NativeEnvironment(loader=_SourceLoader("<native>"), cache_size=0)
+
+
+def _set_bytecode_cache(bytecode_cache):
+    _environment.bytecode_cache = bytecode_cache
+    _native_environment.bytecode_cache = bytecode_cache
+
+
+def set_bytecode_cache_dir(cache_dir):
+    """Store compiled template bytecode under cache_dir so that it can be
+    reused by other processes. Bytecode is kept in a folder per library
+    version which invalidates it once the library is upgraded. An empty
+    cache_dir disables the bytecode cache.
+    :param cache_dir: directory to store bytecode, e.g. the checkpoint dir.
+    """
+    if not cache_dir:
+        _set_bytecode_cache(None)
+        return
+
+    directory = op.join(cache_dir, BYTECODE_CACHE_FOLDER, __version__)
+    bytecode_cache = _environment.bytecode_cache
+    if bytecode_cache is not None and bytecode_cache.directory == directory:
+        return
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError as ex:
+        _logger.warning(
+            "Unable to create template bytecode cache dir=%s: %s", directory, ex
+        )
+        _set_bytecode_cache(None)
+        return
+    _set_bytecode_cache(_BytecodeCache(directory))
+    _logger.debug("Template bytecode cache dir=%s", directory)
+
+
+def is_literal(template):
+    """Return `True` if template is a plain string without any Jinja2
+    expression, statement or comment."""
+    # Jinja2 strips a single trailing newline, leave such strings to Jinja2.
+    return not template.endswith(("\n", "\r")) and not any(
+        marker in template for marker in _JINJA_MARKERS
+    )
+
+
+def _get_attribute(obj, attribute):
+    """Look up attribute the same way as Jinja2 does: try attribute first
+    and then fall back to item."""
+    try:
+        return getattr(obj, attribute)
+    except AttributeError:
+        pass
+    try:
+        return obj[attribute]
+    except (TypeError, LookupError, AttributeError):
+        return _undefined
+
+
+def _find_variables(ast):
+    """Find names of context variables which a parsed template references.
+    Return `None` if the rendered value is not determined by them."""
+    names = meta.find_undeclared_variables(ast)
+    filters = {node.name for node in ast.find_all(nodes.Filter)}
+    if not _VOLATILE_NAMES.isdisjoint(names | filters):
+        return None
+    return tuple(sorted(names))
+
 
-def compile_template(template):
-    _origin_template = template
-    _template = Template(template)
+def _compile_literal(template):
+    # Same as Jinja2, newlines are normalized to "\n"
+    template = _NEWLINE.sub("\n", template)
+
+    def translate_internal(context):
+        return template
+
+    translate_internal.variables = ()
+    return translate_internal
+
+
+def _compile_variable(name):
+    def translate_internal(context):
+        context_var = context.get(name)
+        return context_var if context_var else ""
+
+    translate_internal.variables = (name,)
+    return translate_internal
+
+
+def _compile_path(path):
+    name, *attributes = path.split(".")
+
+    def translate_internal(context):
+        value = context.get(name, _undefined)
+        owner = name
+        for attribute in attributes:
+            if value is _undefined:
+                raise UndefinedError(f"'{owner}' is undefined")
+            value = _get_attribute(value, attribute)
+            owner = attribute
+        if value is _undefined:
+            return ""
+        # Same as Jinja2, the value is rendered to a string
+        return value if isinstance(value, str) else str(value)
+
+    translate_internal.variables = (name,)
+    return translate_internal
+
+
+def _compile_jinja(template, native):
+    environment = _native_environment if native else _environment
+    _template = environment.get_template(template)
 
     def translate_internal(context):
-        match = re.match(PATTERN, _origin_template)
-        if match:
-            context_var = context.get(match.groups()[0])
-            return context_var if context_var else ""
         return _template.render(context)
 
+    translate_internal.variables = _find_variables(_environment.parse(template))
     return translate_internal
+
+
+@lru_cache(maxsize=defaults.template_cache_size)
+def compile_template(template, native=False):
+    """Compile template into a function which renders it with a context.
+
+    The template is classified once here. Literals, single variables and
+    dotted attribute paths are resolved without Jinja2, everything else is
+    rendered by Jinja2. A single variable keeps the type of the value found
+    in context, or is "" if the value is empty. Literals and dotted paths
+    render the same string as Jinja2. Compiled templates are shared process
+    wide and keyed by their source.
+
+    By default Jinja2 renders a template to a string. If native is `True`
+    the template is rendered with `jinja2.nativetypes.NativeEnvironment`
+    which keeps Python objects like `list` and `dict` intact, note that
+    a rendered string is also evaluated as a Python literal if possible.
+
+    The returned function has a `variables` attribute which is a tuple of
+    context variable names the template references, or `None` if they
+    can't be determined.
+    """
+    if is_literal(template):
+        return _compile_literal(template)
+
+    match = PATTERN.match(template)
+    if match:
+        return _compile_variable(match.group(1))
+
+    match = PATH_PATTERN.match(template)
+    if match and not native:
+        return _compile_path(match.group(1))
+
+    return _compile_jinja(template, native)
+
+
+def template_cache_info():
+    """Return hits, misses, maxsize and currsize of the compiled template
+    cache as a named tuple."""
+    return compile_template.cache_info()
+
+
+def clear_template_cache():
+    """Drop all compiled templates and reset the cache statistics."""
+    compile_template.cache_clear()
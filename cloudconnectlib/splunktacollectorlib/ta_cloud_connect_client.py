@@ -28,7 +28,9 @@ class TACloudConnectClient(TaDataClient):
         self._cc_config_file = self._meta_config["cc_json_file"]
         from ..client import CloudConnectClient as Client
         from ..core.pipemgr import PipeManager
+        from ..core.template import set_bytecode_cache_dir
 
+        set_bytecode_cache_dir(self._meta_config.get(c.checkpoint_dir))
         self._pipe_mgr = PipeManager(event_writer=event_writer)
         self._client = Client(self._task_config, self._cc_config_file, checkpoint_mgr)
 
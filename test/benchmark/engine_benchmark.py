@@ -0,0 +1,101 @@
+#
+# Copyright 2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Compare CloudConnectEngine with AsyncCloudConnectEngine against a local
+mock server which responds after a fixed latency. Both engines run with the
+same number of worker threads, and the async engine may send as many
+concurrent requests to the server as it has workers.
+
+Usage: python -m test.benchmark.engine_benchmark [tenant count] [latency ms]
+    [workers]
+"""
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cloudconnectlib.core import defaults
+from cloudconnectlib.core.engine_async import AsyncCloudConnectEngine
+from cloudconnectlib.core.engine_v2 import CloudConnectEngine
+from cloudconnectlib.core.job import CCEJob
+from cloudconnectlib.core.task import CCEHTTPRequestTask
+
+PAGES = 3
+
+
+def _handler(latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = json.dumps({"items": [{"id": i} for i in range(20)]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def _jobs(url, count):
+    jobs = []
+    for i in range(count):
+        task = CCEHTTPRequestTask({"url": f"{url}/tenant{i}"}, f"tenant{i}")
+        task.add_postprocess_handler(
+            "json_path", ["{{__response__.body}}", "$.items[*].id"], "ids"
+        )
+        task.set_iteration_count(PAGES)
+        job = CCEJob(context={})
+        job.add_task(task)
+        jobs.append(job)
+    return jobs
+
+
+def main(count, latency, workers):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _handler(latency))
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    try:
+        engines = (
+            CloudConnectEngine(max_workers=workers),
+            AsyncCloudConnectEngine(max_workers=workers, max_per_host=workers),
+        )
+        for engine in engines:
+            jobs = _jobs(url, count)
+            start = time.time()
+            engine.start(jobs)
+            elapsed = time.time() - start
+            print(
+                f"{type(engine).__name__:<24} {count} tenants x {PAGES} pages"
+                f" with {workers} workers in {elapsed:.2f}s,"
+                f" {count * PAGES / elapsed:.0f} requests/s"
+            )
+    finally:
+        httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        (int(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000,
+        int(sys.argv[3]) if len(sys.argv) > 3 else defaults.async_max_workers,
+    )
@@ -0,0 +1,58 @@
+#
+# Copyright 2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Compare jsonpath_ng with SimpleJSONPath on large arrays.
+
+Usage: python -m test.benchmark.json_path_benchmark [item count]
+"""
+import sys
+import timeit
+
+from jsonpath_ng import parse
+
+from cloudconnectlib.core.jsonpath import simplify
+
+EXPRESSIONS = ("$.items[*]", "$.items[*].id", "$.meta.next")
+
+
+def _document(count):
+    return {
+        "meta": {"next": "token"},
+        "items": [{"id": i, "name": f"item-{i}"} for i in range(count)],
+    }
+
+
+def main(count):
+    document = _document(count)
+    for expr in EXPRESSIONS:
+        expression = parse(expr)
+        simple = simplify(expression)
+        assert simple.values(document) == [m.value for m in expression.find(document)]
+
+        jsonpath_ng_time = min(
+            timeit.repeat(lambda: expression.find(document), number=1, repeat=5)
+        )
+        simple_time = min(
+            timeit.repeat(lambda: simple.values(document), number=1, repeat=5)
+        )
+        print(
+            f"{expr:<16} jsonpath_ng {jsonpath_ng_time * 1000:9.2f}ms  "
+            f"simple {simple_time * 1000:9.2f}ms  "
+            f"x{jsonpath_ng_time / max(simple_time, 1e-9):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
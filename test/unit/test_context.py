@@ -0,0 +1,116 @@
+#
+# Copyright 2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import copy
+
+import pytest
+
+from cloudconnectlib.core import context as context_module
+from cloudconnectlib.core.context import Context
+from cloudconnectlib.core.template import compile_template
+
+
+def test_context_write_through():
+    data = {"a": 1}
+    ctx = Context(data)
+    ctx["b"] = 2
+    ctx.update({"c": 3})
+    del ctx["a"]
+    assert data == {"b": 2, "c": 3}
+    assert Context.wrap(ctx) is ctx
+    assert Context.wrap(data).get("b") == 2
+
+
+def test_context_stamps():
+    ctx = Context({"a": 1, "b": 2})
+    stamps = ctx.stamps(("a", "b", "missing"))
+    assert stamps[2] == 0
+    ctx["b"] = 2
+    new_stamps = ctx.stamps(("a", "b", "missing"))
+    assert new_stamps[0] == stamps[0]
+    assert new_stamps[1] != stamps[1]
+
+
+def test_context_fork():
+    parent = Context({"a": 1, "b": 2, "body": {"k": "v"}})
+    child = parent.fork()
+    assert dict(child) == {"a": 1, "b": 2, "body": {"k": "v"}}
+    # Inherited values are shared until they are isolated
+    assert child["body"] is parent["body"]
+    assert child.stamps(("a",)) == parent.stamps(("a",))
+
+    child["a"] = 10
+    child["c"] = 3
+    del child["b"]
+    assert dict(child) == {"a": 10, "body": {"k": "v"}, "c": 3}
+    assert len(child) == 3
+    assert "b" not in child
+    with pytest.raises(KeyError):
+        child["b"]
+    with pytest.raises(KeyError):
+        del child["b"]
+    assert dict(parent) == {"a": 1, "b": 2, "body": {"k": "v"}}
+
+    grandchild = child.fork()
+    grandchild["b"] = 20
+    assert dict(grandchild) == {"a": 10, "b": 20, "body": {"k": "v"}, "c": 3}
+
+    assert grandchild.isolate("body") is not parent["body"]
+    assert grandchild["body"] == parent["body"]
+
+    copied = copy.deepcopy(grandchild)
+    assert copied == grandchild
+    assert copied["body"] is not parent["body"]
+
+
+def test_context_fork_isolation():
+    parent = Context({"items": [{"id": 1}], "meta": {"tags": ["a"]}, "n": 1})
+    first, second = parent.fork(), parent.fork()
+    first.isolate("items").append({"id": 2})
+    first["items"][0]["id"] = 10
+    first.isolate("meta")["tags"].append("b")
+    assert first["items"] == [{"id": 10}, {"id": 2}]
+    assert first["meta"] == {"tags": ["a", "b"]}
+    assert second["items"] == [{"id": 1}] and second["meta"] == {"tags": ["a"]}
+    assert dict(parent) == {"items": [{"id": 1}], "meta": {"tags": ["a"]}, "n": 1}
+    # The copied value keeps the stamp of the inherited one
+    assert first.stamps(("items", "n")) == parent.stamps(("items", "n"))
+    # A value of this layer or an immutable one is returned as is
+    assert first.isolate("items") is first["items"]
+    assert first.isolate("n") == 1
+    with pytest.raises(KeyError):
+        first.isolate("missing")
+
+    grandchild = first.fork()
+    grandchild.isolate("items").clear()
+    assert first["items"] == [{"id": 10}, {"id": 2}]
+    assert "items" in grandchild and not grandchild["items"]
+
+
+def test_context_fork_render_without_copy(monkeypatch):
+    def deepcopy(value, memo=None):
+        raise AssertionError("inherited value is copied")
+
+    monkeypatch.setattr(context_module.copy, "deepcopy", deepcopy)
+    items = [{"id": i} for i in range(1000)]
+    parent = Context({"items": items, "meta": {"name": "n"}, "n": 1})
+    render = compile_template("{{ meta.name }}-{{ items | length }}-{{ n }}-{{ i }}")
+    for i in range(300):
+        child = parent.fork()
+        child["i"] = i
+        assert render(child) == f"n-1000-1-{i}"
+        assert dict(child)["items"] is items
+        # Nothing inherited is copied into the child
+        assert list(child._data) == ["i"]
@@ -0,0 +1,99 @@
+#
+# Copyright 2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from cloudconnectlib.core.engine_async import AsyncCloudConnectEngine
+from cloudconnectlib.core.job import CCEJob
+from cloudconnectlib.core.task import CCEHTTPRequestTask, CCESplitTask
+
+
+class _Handler(BaseHTTPRequestHandler):
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+    count = 0
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.count += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        time.sleep(0.02)
+        body = json.dumps({"tenant": self.path.strip("/")}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with cls.lock:
+            cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    _Handler.count = _Handler.max_active = 0
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _http_task(url):
+    task = CCEHTTPRequestTask({"url": url, "method": "GET"}, "test_async_task")
+    task.add_postprocess_handler(
+        "json_path", ["{{__response__.body}}", "$.tenant"], "tenant"
+    )
+    task.set_iteration_count(2)
+    return task
+
+
+def test_async_engine_runs_jobs(server):
+    contexts = [{} for _ in range(20)]
+    jobs = []
+    for i, context in enumerate(contexts):
+        job = CCEJob(context=context)
+        job.add_task(_http_task(f"{server}/t{i}"))
+        jobs.append(job)
+
+    AsyncCloudConnectEngine(max_workers=8, max_per_host=3).start(jobs)
+    assert [context.get("tenant") for context in contexts] == [
+        f"t{i}" for i in range(20)
+    ]
+    assert _Handler.count == 40
+    assert 1 < _Handler.max_active <= 3
+
+
+def test_async_engine_runs_split_jobs(server):
+    split_task = CCESplitTask("test_async_split")
+    split_task.configure_split("split_by", "{{tenants}}", "tenant_id")
+    task = _http_task(server + "/{{tenant_id}}")
+    task.add_postprocess_handler("set_var", ["{{tenant}}"], "tenant_done")
+    task.add_postprocess_handler("std_output", ["{{tenant_done}}"])
+
+    job = CCEJob(context={"tenants": ["a", "b", "c"]}, tasks=[split_task, task])
+    AsyncCloudConnectEngine(max_workers=2).start([job])
+    assert _Handler.count == 6
@@ -17,6 +17,7 @@ import threading
 import time
 
 import cloudconnectlib.core.engine_v2 as engine
+from cloudconnectlib.core.task import RetryLater
 
 
 class Counter:
@@ -99,3 +100,114 @@ def test_stop_jobs():
     cc_engine.start([HTTPJob(counter), SplitJob(split_counter, stop_counter)])
     assert counter.value() == 1
     assert stop_counter.value() + split_counter.value() <= 10
+
+
+class LazySplitJob:
+    def __init__(self, counter, produced):
+        self._counter = counter
+        self._produced = produced
+
+    def run(self):
+        for _ in range(20):
+            self._produced.increment()
+            yield HTTPJob(self._counter)
+
+    def stop(self):
+        pass
+
+
+def test_bounded_pending_jobs(monkeypatch):
+    counter = Counter()
+    produced = Counter()
+    cc_engine = engine.CloudConnectEngine(max_pending_jobs=4)
+    max_pending = []
+    add_job = cc_engine._add_job
+
+    def _add_job(job):
+        max_pending.append(len(cc_engine._pending_job_results))
+        return add_job(job)
+
+    monkeypatch.setattr(cc_engine, "_add_job", _add_job)
+    cc_engine.start([LazySplitJob(counter, produced)])
+    assert counter.value() == 20
+    assert produced.value() == 20
+    assert max(max_pending) < 4
+
+
+class AliveJobs:
+    def __init__(self):
+        self.created = 0
+        self.finished = 0
+        self.peak = 0
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def create(self):
+        with self._lock:
+            self.created += 1
+
+    def finish(self):
+        with self._lock:
+            self.peak = max(self.peak, self.created - self.finished)
+            self.threads.add(threading.current_thread().name)
+            self.finished += 1
+
+
+def test_bounded_alive_split_jobs():
+    from cloudconnectlib.core.job import CCEJob
+    from cloudconnectlib.core.task import BaseTask, CCESplitTask
+
+    alive = AliveJobs()
+
+    class _SplitTask(CCESplitTask):
+        def perform(self, context):
+            for i in range(1000):
+                alive.create()
+                yield {"item": i}
+
+    class _ItemTask(BaseTask):
+        def perform(self, context):
+            time.sleep(0.001)
+            alive.finish()
+            yield context
+
+    cc_engine = engine.CloudConnectEngine(max_pending_jobs=4)
+    cc_engine.start([CCEJob({}, tasks=[_SplitTask("split"), _ItemTask("item")])])
+    assert alive.finished == 1000
+    assert alive.peak <= 4
+    assert "MainThread" not in alive.threads
+
+
+class RetryJob:
+    def __init__(self, events):
+        self._events = events
+
+    def run(self):
+        self._events.append("retry")
+        yield RetryLater(0.5)
+        self._events.append("resumed")
+
+    def stop(self):
+        pass
+
+
+class EventJob:
+    def __init__(self, events):
+        self._events = events
+
+    def run(self):
+        self._events.append("other")
+
+    def stop(self):
+        pass
+
+
+def test_retry_later_jobs():
+    events = []
+    cc_engine = engine.CloudConnectEngine(max_workers=1)
+    start = time.time()
+    cc_engine.start([RetryJob(events), EventJob(events)])
+    # The only worker runs another job instead of sleeping for the retry
+    assert events == ["retry", "other", "resumed"]
+    assert time.time() - start >= 0.5
+    assert not cc_engine._pending_jobs
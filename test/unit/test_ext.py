@@ -13,26 +13,42 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import calendar
+import json
+import re
+import threading
+from datetime import datetime
+
 import pytest
+from jsonpath_ng import parse
 
-from cloudconnectlib.core.exceptions import StopCCEIteration
+from cloudconnectlib.core.exceptions import FuncException, StopCCEIteration
 from cloudconnectlib.core.ext import (
     _fix_microsecond_format,
     _fix_timestamp_format,
     assert_true,
+    compile_json_path,
+    compile_regex,
     exit_if_true,
     is_true,
+    json_emit,
     json_empty,
     json_not_empty,
     json_path,
+    json_stream,
     lookup_method,
+    precompile_arguments,
     regex_match,
     regex_search,
     set_var,
     splunk_xml,
     std_output,
     time_str2str,
+    time_str2str_batch,
 )
+from cloudconnectlib.core.http import ResponseBody
+from cloudconnectlib.core.jsonpath import SimpleJSONPath
+from cloudconnectlib.core.pipemgr import PipeManager
 
 
 def test_regex_match():
@@ -42,6 +58,28 @@ def test_regex_match():
     assert regex_match("", "abcd")
 
 
+def test_compiled_regex():
+    compile_regex.cache_clear()
+    pattern = compile_regex(r"<(?P<url>[^>]+)>;\s*rel=\"next\"")
+    assert compile_regex(r"<(?P<url>[^>]+)>;\s*rel=\"next\"") is pattern
+    link = '<https://host/api?page=2>; rel="next"'
+    assert regex_search(pattern, link) == {"url": "https://host/api?page=2"}
+    assert regex_match(pattern, link)
+    assert not regex_match(compile_regex("^from"), "From here")
+    assert regex_match(compile_regex("^from"), "From here", re.IGNORECASE)
+    assert regex_match("^from", "From here", re.IGNORECASE)
+    assert compile_regex.cache_info().currsize == 3
+
+    args = precompile_arguments("regex_search", ["^a(?P<b>.)", "{{text}}"])
+    assert args[0] is compile_regex("^a(?P<b>.)")
+    assert args[1] == "{{text}}"
+    args = precompile_arguments("regex_match", ["{{pattern}}", "{{text}}"])
+    assert args == ["{{pattern}}", "{{text}}"]
+    with pytest.raises(ValueError):
+        precompile_arguments("regex_match", ["(unclosed", "{{text}}"])
+    assert regex_match("(unclosed", "text") is False
+
+
 def test_splunk_xml():
     event1 = splunk_xml("data1", time="", index="", source="", sourcetype="", host="")
     assert event1[0] == "<stream><event>" "<data>data1</data></event></stream>"
@@ -89,6 +127,121 @@ def test_json_path():
         assert r == result
 
 
+def test_json_path_response_parsed_once(monkeypatch):
+    loads = []
+    original_loads = json.loads
+
+    def counting_loads(*args, **kwargs):
+        loads.append(args[0])
+        return original_loads(*args, **kwargs)
+
+    monkeypatch.setattr(json, "loads", counting_loads)
+    body = ResponseBody('{"items": [{"id": 1, "tags": ["a"]}], "total": 1}')
+    items = json_path(body, "$.items")
+    assert json_path(body, "$.total") == 1
+    assert json_path(body, "$.items[*].id") == 1
+    assert list(json_stream(body, "$..items[*]")) == items
+    # Body is parsed once and extracted values are shared with its document
+    assert len(loads) == 1
+    assert json_path(body, "$.items") is items is body.json()["items"]
+
+    # Values extracted from a parsed document are returned as they are
+    source = {"items": [{"id": 1}]}
+    assert json_path(source, "$.items")[0] is source["items"][0]
+
+
+def test_compiled_json_path():
+    compile_json_path.cache_clear()
+    expression = compile_json_path("$.items[*].id")
+    assert compile_json_path("$.items[*].id") is expression
+    assert compile_json_path.cache_info().hits == 1
+
+    source = {"items": [{"id": 1}, {"id": 2}]}
+    assert json_path(source, expression) == [1, 2]
+    assert json_path(source, "$.items[*].id") == [1, 2]
+
+    args = precompile_arguments("json_path", ["{{__response__.body}}", "$.items"])
+    assert args[0] == "{{__response__.body}}"
+    assert args[1] is compile_json_path("$.items")
+
+    args = precompile_arguments("json_empty", ["{{body}}", "{{expr}}"])
+    assert args == ["{{body}}", "{{expr}}"]
+    assert precompile_arguments("json_empty", ["{{body}}"]) == ["{{body}}"]
+    assert precompile_arguments("json_path", ["{{body}}", "$[?"]) == [
+        "{{body}}",
+        "$[?",
+    ]
+    assert precompile_arguments("set_var", ["$.items"]) == ["$.items"]
+
+
+def _find_or_error(find):
+    try:
+        return find()
+    except TypeError:
+        return TypeError
+
+
+def test_simple_json_path():
+    docs = [
+        {"items": [{"id": 1}, {"id": None}, {"name": "a"}, 3, "s", [1]]},
+        {"items": {"id": 1}},
+        {"items": [[{"id": 1}], []], "data": {"items": "abc"}},
+        {"items": None},
+        {"items": 0},
+        {"items": ""},
+        {"items": 5, "data": {"items": True}},
+        {"items": 1.5, "data": {"items": False}},
+        {"items": [0, "", False, 1.5, None], "data": {"items": 0.0}},
+        [{"id": 1}, {"id": 2}],
+        "text",
+        None,
+    ]
+    exprs = [
+        "$",
+        "$[*]",
+        "$.items",
+        "$.items[*]",
+        "$.items[*].id",
+        "$.items[*][*]",
+        "$.items[*][*].id",
+        "$.data.items[*]",
+        "items[*].id",
+        "$[*].id",
+    ]
+    for expr in exprs:
+        expression = compile_json_path(expr)
+        assert isinstance(expression, SimpleJSONPath)
+        for doc in docs:
+            # Values like float or bool are matched differently across
+            # versions of jsonpath_ng, the result is the same as the
+            # installed one, including the error raised.
+            expected = _find_or_error(
+                lambda: [match.value for match in parse(expr).find(doc)]
+            )
+            assert _find_or_error(lambda: expression.values(doc)) == expected
+
+    for expr in ("$..id", "$.items[0]", "$.items[*].*", "$.a|$.b"):
+        assert not isinstance(compile_json_path(expr), SimpleJSONPath)
+    source = {"items": [{"id": 1}, {"id": 2}]}
+    assert json_path(source, "$..id") == [1, 2]
+
+
+def test_json_stream():
+    body = '{"items": [{"id": 1}, {"id": 2}, {"id": 3}]}'
+    assert list(json_stream(body, "$.items[*]")) == [{"id": 1}, {"id": 2}, {"id": 3}]
+    assert list(json_stream(body, "$.items[*].id")) == [1, 2, 3]
+    assert list(json_stream(body, "$.missing[*]")) == []
+    assert list(json_stream("", "$.items[*]")) == []
+    assert list(json_stream('{"items": [1, ', "$.items[*]")) == [1]
+
+    events = splunk_xml(json_stream(body, "$.items[*].id"), index="main")
+    assert list(events) == [
+        "<stream><event><index>main</index><data>1</data></event>"
+        "<event><index>main</index><data>2</data></event>"
+        "<event><index>main</index><data>3</data></event></stream>"
+    ]
+
+
 def test_std_output():
     import sys
 
@@ -121,6 +274,112 @@ def test_std_output():
     assert mock_stdout.read() == "abcdefghijkl1234!@#$%^\n"
 
 
+def test_std_output_batches(monkeypatch):
+    batches = []
+
+    class EventWriter:
+        def write_events(self, events):
+            batches.append(events)
+            return True
+
+    pipe = PipeManager()
+    monkeypatch.setattr(pipe, "_event_writer", EventWriter())
+    events = [str(i) for i in range(2500)]
+    assert std_output(iter(events)) is True
+    assert [len(batch) for batch in batches] == [1000, 1000, 500]
+    assert sum(batches, []) == events
+
+    batches.clear()
+    std_output(["a", {"b": 1}, [2]])
+    assert batches == [["a", '{"b": 1}', "[2]"]]
+
+    monkeypatch.setattr(EventWriter, "write_events", lambda self, events: False)
+    with pytest.raises(FuncException):
+        std_output(["a"])
+    assert pipe.flush() is True
+
+
+def test_pipe_buffer_per_thread(monkeypatch):
+    written = []
+
+    class EventWriter:
+        def write_events(self, events):
+            # Events of thread "a" fail to write
+            if "a" in events:
+                return False
+            written.extend(events)
+            return True
+
+    pipe = PipeManager()
+    monkeypatch.setattr(pipe, "_event_writer", EventWriter())
+    barrier = threading.Barrier(2, timeout=5)
+    results = {}
+
+    def output(name):
+        pipe.buffer_events([name])
+        # Both threads buffer events before either flushes
+        barrier.wait()
+        results[name] = pipe.flush()
+
+    threads = [threading.Thread(target=output, args=(n,)) for n in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {"a": False, "b": True}
+    assert written == ["b"]
+
+
+def test_json_emit(monkeypatch):
+    written = []
+
+    class EventWriter:
+        def write_events(self, events):
+            written.extend(events)
+            return True
+
+    monkeypatch.setattr(PipeManager(), "_event_writer", EventWriter())
+
+    def events():
+        found = re.findall(r"<event>.*?</event>", "".join(written))
+        written.clear()
+        return found
+
+    docs = [
+        {"items": [{"id": i, "v": "<&>"} for i in range(250)], "next": "n"},
+        {"items": [[1, 2]], "next": {"a": 1}},
+        {"items": [None, 0, "s"]},
+        {"items": {"id": 1}},
+        {"items": 0, "next": False},
+        {"items": "", "next": None},
+        {"items": {}, "next": 0.0},
+        {"items": [0], "next": [""]},
+    ]
+    header = {"time": "1.5", "index": "main", "sourcetype": "st"}
+    for doc in docs:
+        body = json.dumps(doc)
+        for expr in ("$.items", "$.items[*]", "$.next", "$..id", "$.items[*].id"):
+            expected = json_path(body, expr)
+            std_output(splunk_xml(expected, source="s", **header))
+            expected_events = events()
+            if expected == "":
+                # json_path returns "" if nothing found, it's an empty event
+                expected_events = []
+
+            result = json_emit(body, expr, event_source="s", **header)
+            assert events() == expected_events
+            assert result["count"] == len(expected_events)
+            if isinstance(expected, list) and expected:
+                assert result["last"] == expected[-1]
+
+            assert json_emit(doc, expr, event_source="s", **header) == result
+            assert events() == expected_events
+
+    assert json_emit('{"items": []}', "$.items") == {"count": 0, "last": None}
+    assert json_emit("", "$.items") == {"count": 0, "last": None}
+    assert written == []
+
+
 def test_json_empty():
     empty_cases = ["{}", {}, "[]", [], "", ["", "", {}]]
     for case in empty_cases:
@@ -238,6 +497,74 @@ def test_time_str2str():
         assert r == vt
 
 
+def _time_str2str_by_regex(date_string, from_format, to_format):
+    try:
+        dt = datetime.strptime(date_string, from_format)
+        if to_format:
+            timestamp = calendar.timegm(dt.timetuple())
+            to_format = _fix_timestamp_format(to_format, str(timestamp))
+            to_format = _fix_microsecond_format(to_format, str(dt.microsecond))
+        return dt.strftime(to_format)
+    except Exception:
+        return date_string
+
+
+def test_time_str2str_batch():
+    date_strings = [
+        "2015-01-12T00:00:01",
+        "2015-01-12T00:00:01.5",
+        "2015-01-12T00:00:01.123456",
+        "2015-01-12T00:00:01.123456Z",
+        "2015-01-12 00:00:01",
+        "2015-1-12 00:00:01",
+        "2015-01-12t00:00:01",
+        "2015-01-12  00:00:01",
+        "2015-13-12T00:00:01",
+        "2015-01-12T00:00:61",
+        "1970-01-01T00:00:05",
+        "garbage",
+        "",
+        123,
+        None,
+    ]
+    from_formats = [
+        "%Y-%m-%dT%H:%M:%S",
+        "%Y-%m-%d %H:%M:%S",
+        "%Y-%m-%dT%H:%M:%S.%f",
+        "%Y-%m-%d %H:%M:%S.%f",
+        "%Y-%m-%dT%H:%M:%SZ",
+        "%Y-%m-%dT%H:%M:%S.%fZ",
+    ]
+    to_formats = [
+        "%s",
+        "%s.%3f",
+        "%Y-%m-%d %H:%M:%S.%6f+00:00",
+        "%%s %%%s %%%%s%1f%%2f%%%2f%7f",
+        "%%%sf",
+        "%Y%m%d",
+        "",
+        None,
+    ]
+    for from_format in from_formats:
+        for to_format in to_formats:
+            expected = [
+                _time_str2str_by_regex(ds, from_format, to_format)
+                if isinstance(ds, str)
+                else ds
+                for ds in date_strings
+            ]
+            assert time_str2str_batch(date_strings, from_format, to_format) == expected
+            assert [
+                time_str2str(ds, from_format, to_format) for ds in date_strings
+            ] == expected
+
+    assert time_str2str_batch(iter(["21/11/06 16:30"]), "%d/%m/%y %H:%M", "%s") == [
+        "1164126600"
+    ]
+    for not_list in ("2015-01-12", None, 123, {"a": 1}):
+        assert time_str2str_batch(not_list, "%Y-%m-%d", "%s") == not_list
+
+
 def test_fix_timestamp_format():
     cases = [
         ("%s", "1392134402", "1392134402"),
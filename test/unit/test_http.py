@@ -13,7 +13,101 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
-from cloudconnectlib.core.http import _make_prepare_url_func
+import asyncio
+import io
+import json
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+from requests import Session
+from requests.structures import CaseInsensitiveDict
+
+from cloudconnectlib.core import defaults
+from cloudconnectlib.core.exceptions import HTTPError
+from cloudconnectlib.core.ext import (
+    json_empty,
+    json_not_empty,
+    json_path,
+    json_stream,
+)
+from cloudconnectlib.core.http import (
+    AsyncHttpClient,
+    CacheValidators,
+    HttpClient,
+    HTTPResponse,
+    RateLimit,
+    RateLimiter,
+    RetryPolicy,
+    SessionPool,
+    StreamingHTTPResponse,
+    TokenBucket,
+    _make_prepare_url_func,
+)
+from cloudconnectlib.core.models import Request
+
+
+class MockedResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(
+            headers or {"Content-Type": "application/json"}
+        )
+
+
+def test_response_json_parsed_once(monkeypatch):
+    loads = json.loads
+    calls = []
+
+    def counted_loads(*args, **kwargs):
+        calls.append(1)
+        return loads(*args, **kwargs)
+
+    monkeypatch.setattr(json, "loads", counted_loads)
+    response = HTTPResponse(MockedResponse(), b'{"items": [{"id": 1}, {"id": 2}]}')
+    body = response.body
+    assert body == '{"items": [{"id": 1}, {"id": 2}]}'
+    assert json_path(body, "$.items[*].id") == [1, 2]
+    assert json_not_empty(body, "$.items")
+    assert not json_empty(body)
+    assert response.json() is body.json()
+    assert len(calls) == 1
+
+    response = HTTPResponse(MockedResponse(), b"not a json")
+    assert json_path(response.body, "$") == "not a json"
+    assert not json_empty(response.body)
+    assert len(calls) == 2
+
+
+def test_response_decoded_lazily(monkeypatch):
+    content = '{"name": "caf\u00e9"}'.encode("utf-8")
+    response = HTTPResponse(MockedResponse(), content)
+    assert response.raw is content
+    assert json_path(response, "$.name") == "caf\u00e9"
+    assert response.json() == {"name": "caf\u00e9"}
+    assert not response.is_blank()
+    # JSON is parsed from bytes, body is never decoded
+    assert response._body is None
+    assert response.text is response.body
+    assert response.body.json() is response.json()
+
+    headers = {"Content-Type": "application/json; charset=utf-16"}
+    response = HTTPResponse(MockedResponse(headers=headers), " \n".encode("utf-16"))
+    assert response.is_blank()
+    response = HTTPResponse(MockedResponse(headers=headers), "[1]".encode("utf-16"))
+    assert response.json() == [1]
+
+    headers = {"Content-Type": "application/json; charset=latin-1"}
+    response = HTTPResponse(MockedResponse(headers=headers), b'["caf\xe9"]')
+    assert response.json() == ["caf\u00e9"]
+    assert response._body is not None
+
+    response = HTTPResponse(MockedResponse(), b'["caf\xe9"]')
+    assert response.json() == ["caf\ufffd"]
+
+    response = HTTPResponse(MockedResponse(), b"")
+    assert response.is_blank() and response.body == ""
 
 
 def test_make_prepare_url_func():
@@ -57,3 +151,270 @@ def test_make_prepare_url_func():
     assert rurl7 == "https://jira.splunk.com/browse/Query?JIRA=ADDON%2012156"
     assert rurl8 == url8
     assert rurl9 == url9
+
+
+def test_session_pool(monkeypatch):
+    pool = SessionPool()
+    first, second = Session(), Session()
+    pool.mount(first, "https://api.example.com/v1/items?page=2", True)
+    pool.mount(second, "https://API.example.com/v1/users", True)
+    adapter = first.get_adapter("https://api.example.com/v1/other")
+    assert second.get_adapter("https://api.example.com/") is adapter
+    assert first.cookies is not second.cookies
+    assert first.get_adapter("https://api.example.com.evil/") is not adapter
+    assert pool.stats() == {"hits": 1, "misses": 1, "evictions": 0, "size": 1}
+
+    pool.mount(first, "https://api.example.com/v1/items", False)
+    second.proxies = {"https": "http://proxy:3128", "http": "http://proxy:3128"}
+    pool.mount(second, "https://api.example.com/v1/items", True)
+    assert pool.stats()["misses"] == 3
+
+    monkeypatch.setattr(defaults, "http_pool_idle_timeout", -1)
+    pool.mount(first, "https://other.example.com/", True)
+    assert pool.stats() == {"hits": 1, "misses": 4, "evictions": 3, "size": 1}
+    pool.clear()
+    assert pool.stats()["size"] == 0
+
+
+def test_retry_policy():
+    policy = RetryPolicy(retries=3, backoff_factor=2, max_delay=5)
+    assert policy.get_delay(0, 200) is None
+    assert policy.get_delay(3, 503) is None
+    for attempt, low in ((0, 1), (1, 2), (2, 4)):
+        for _ in range(20):
+            assert low <= policy.get_delay(attempt, 503) <= min(low * 2, 5)
+
+    assert policy.get_delay(0, 429, {"Retry-After": "3"}) == 3
+    assert policy.get_delay(0, 429, {"Retry-After": "5"}) == 5
+    assert policy.get_delay(0, 429, {"Retry-After": "120"}) is None
+    assert policy.get_delay(0, 429, {"Retry-After": "soon"}) <= 2
+    assert policy.get_delay(0, 429, {"Retry-After": formatdate(0)}) == 0
+    later = formatdate(time.time() + 4, usegmt=True)
+    assert 2 < policy.get_delay(0, 429, {"Retry-After": later}) <= 4
+
+
+def test_async_retry_without_blocking(monkeypatch):
+    responses = [
+        HTTPResponse(MockedResponse(503, {"Retry-After": "0"}), b""),
+        HTTPResponse(MockedResponse(429), b""),
+        HTTPResponse(MockedResponse(200), b"{}"),
+    ]
+    client = HttpClient(retry_policy=RetryPolicy(retries=3, backoff_factor=0.01))
+    monkeypatch.setattr(client, "send_once", lambda request: responses.pop(0))
+    delays = []
+    sleep = asyncio.sleep
+
+    async def recorded_sleep(delay):
+        delays.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", recorded_sleep)
+    request = Request("GET", "https://host/path", None, None)
+    loop = asyncio.new_event_loop()
+    try:
+        response = loop.run_until_complete(AsyncHttpClient(client).send(request))
+    finally:
+        loop.close()
+    assert response.status_code == 200
+    assert delays[0] == 0 and 0.01 <= delays[1] <= 0.02
+
+
+def test_sync_retry(monkeypatch):
+    statuses = [500, 500, 500, 500, 200]
+    client = HttpClient(retry_policy=RetryPolicy(retries=3, backoff_factor=0))
+    monkeypatch.setattr(
+        client,
+        "_send_once",
+        lambda *args: HTTPResponse(MockedResponse(statuses.pop(0)), b""),
+    )
+    response = client._retry_send_request_if_needed("https://host/path")
+    assert response.status_code == 500
+    assert statuses == [200]
+
+
+def make_streamed_response(content, content_type="application/json", status=200):
+    response = requests.Response()
+    response.status_code = status
+    response.headers["Content-Type"] = content_type
+    response.raw = io.BytesIO(content)
+    return response
+
+
+def test_streaming_response():
+    content = json.dumps({"items": [{"name": "caf\u00e9"}] * 50}, ensure_ascii=False)
+    response = StreamingHTTPResponse(
+        make_streamed_response(content.encode("utf-8")), chunk_size=7, spool_size=64
+    )
+    assert response.status_code == 200
+    assert not response.is_blank()
+    assert "".join(response.iter_text()) == content
+    assert b"".join(response.iter_bytes()) == content.encode("utf-8")
+    # Body beyond spool size is moved to disk
+    assert response._spool._rolled
+    assert list(json_stream(response, "$.items[*].name")) == ["caf\u00e9"] * 50
+    assert len(json_path(response, "$.items[*]")) == 50
+    assert response.body == content
+    response.close()
+    assert response.json()["items"][0] == {"name": "caf\u00e9"}
+
+    response = StreamingHTTPResponse(
+        make_streamed_response(
+            "\u00e9t\u00e9".encode("latin-1"), "text/plain; charset=latin-1"
+        ),
+        chunk_size=1,
+    )
+    assert list(response) == ["\u00e9", "t", "\u00e9"]
+
+    response = StreamingHTTPResponse(make_streamed_response(b"  \n "), chunk_size=2)
+    assert response.is_blank()
+
+    response = StreamingHTTPResponse(
+        make_streamed_response(b"[1, 2, 3]"), chunk_size=4, max_body_size=8
+    )
+    with pytest.raises(HTTPError):
+        response.body
+
+    response = StreamingHTTPResponse(make_streamed_response(b"[1, 2]"), chunk_size=2)
+    next(response.iter_bytes())
+    response.close()
+    with pytest.raises(HTTPError):
+        response.content
+
+
+def test_stream_mode(monkeypatch):
+    responses = [
+        make_streamed_response(b"error", status=500),
+        make_streamed_response(b'{"id": 1}'),
+    ]
+    kwargs = []
+
+    def send_internal(self, uri, method, headers=None, body=None):
+        kwargs.append(self.stream)
+        return responses.pop(0)
+
+    monkeypatch.setattr(HttpClient, "_send_internal", send_internal)
+    client = HttpClient(stream=True)
+    response = client._send_once("https://host/path")
+    assert type(response) is HTTPResponse and response.body == "error"
+    response = client._send_once("https://host/path")
+    assert isinstance(response, StreamingHTTPResponse)
+    assert response.json() == {"id": 1}
+    assert kwargs == [True, True]
+
+    # Size limits of streamed bodies are configured by the client
+    responses.append(make_streamed_response(b'{"items": [1, 2, 3]}'))
+    client = HttpClient(stream=True, chunk_size=4, spool_size=8, max_body_size=8)
+    response = client._send_once("https://host/path")
+    assert response._chunk_size == 4
+    with pytest.raises(HTTPError, match="exceeds 8 bytes"):
+        response.body
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    bucket = TokenBucket(rate=2, burst=2)
+    # Burst is available at once, then requests are spaced by 1/rate.
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.5, 1.0]
+    clock.now += 1
+    assert bucket.reserve() == 0.5
+
+    clock.now += 10
+    bucket.feedback(429, {"Retry-After": "3"})
+    assert bucket.reserve() == 3
+    # Not adaptive, the rate is kept
+    assert bucket.rate == 2
+
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_adaptive_token_bucket(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    bucket = TokenBucket(rate=8, adaptive=True, max_rate=10, latency_target=2)
+    bucket.feedback(429)
+    bucket.feedback(429)
+    # Responses throttled at the same time decrease rate once
+    assert bucket.rate == 4
+    clock.now += 1
+    bucket.feedback(200, latency=3)
+    assert bucket.rate == 2
+    for _ in range(20):
+        clock.now += 0.5
+        bucket.feedback(200, latency=0.1)
+    assert bucket.rate == 10
+
+    bucket = TokenBucket(rate=1, adaptive=True, min_rate=0.5)
+    for _ in range(5):
+        clock.now += 1
+        bucket.feedback(503)
+    assert bucket.rate == 0.5
+
+
+def test_rate_limit(monkeypatch):
+    limiter = RateLimiter()
+    monkeypatch.setattr("cloudconnectlib.core.http.rate_limiter", limiter)
+    assert RateLimit.from_setting({}) is None
+    rate_limit = RateLimit.from_setting({"rate": "2", "burst": "3"})
+    assert limiter.bucket(rate_limit, "https://Host:443/a") is limiter.bucket(
+        RateLimit(5), "https://host:443/b"
+    )
+    assert limiter.bucket(rate_limit, "https://host:443/a").burst == 3
+    assert limiter.bucket(rate_limit, "https://other/a").rate == 2
+    with pytest.raises(ValueError):
+        RateLimit(1, burst=0)
+
+    waits = []
+    monkeypatch.setattr(TokenBucket, "wait", lambda self: waits.append(self))
+    responses = [
+        HTTPResponse(MockedResponse(429, {"Retry-After": "0"}), b""),
+        HTTPResponse(MockedResponse(200), b"{}"),
+    ]
+    client = HttpClient(rate_limit=rate_limit)
+    monkeypatch.setattr(client, "_send_once", lambda *args: responses.pop(0))
+    response = client._retry_send_request_if_needed("https://api/path")
+    assert response.status_code == 200
+    assert len(waits) == 2 and waits[0] is limiter.bucket(rate_limit, "https://api")
+    assert HttpClient().get_bucket("https://api") is None
+
+
+def test_cache_validators(monkeypatch):
+    validators = CacheValidators(max_size=2)
+    headers = {"ETag": '"v1"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    validators.record(
+        "https://host/a", "GET", HTTPResponse(MockedResponse(200, headers), b"")
+    )
+    assert validators.changed
+    assert validators.apply("https://host/a", "POST", {}) == {}
+    assert validators.apply("https://host/b", "GET", None) is None
+    conditions = validators.apply("https://host/a", "GET", {"if-none-match": "*"})
+    assert conditions["If-None-Match"] == "*"
+    assert conditions["If-Modified-Since"] == headers["Last-Modified"]
+
+    # Error responses and unchanged validators are ignored
+    validators = CacheValidators(validators.dump(), max_size=2)
+    for status in (200, 500):
+        validators.record(
+            "https://host/a", "GET", HTTPResponse(MockedResponse(status, headers), b"")
+        )
+    assert not validators.changed
+    for url in ("https://host/b", "https://host/c"):
+        validators.record(url, "GET", HTTPResponse(MockedResponse(200, headers), b""))
+    assert list(validators.dump()) == ["https://host/b", "https://host/c"]
+    validators.record("https://host/b", "GET", HTTPResponse(MockedResponse(200), b""))
+    assert list(validators.dump()) == ["https://host/c"]
+
+    sent = []
+    client = HttpClient(validators=validators)
+    monkeypatch.setattr(client, "_send_once", lambda *args: sent.append(args[2]))
+    client.send_once(Request("GET", "https://host/c", {"Accept": "*/*"}, None))
+    assert sent[0]["If-None-Match"] == '"v1"' and sent[0]["Accept"] == "*/*"
@@ -13,14 +13,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import asyncio
+import io
+import json
 import os
 import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
 
 from . import common
 
 sys.path.append(os.path.join(common.PROJECT_ROOT, "package"))
 
-from cloudconnectlib.core.task import CCEHTTPRequestTask
+from cloudconnectlib.core.http import HttpClient, StreamingHTTPResponse
+from cloudconnectlib.core.task import CCEHTTPRequestTask, RetryLater
 
 
 class MockedHttpResponse:
@@ -158,3 +168,297 @@ def test_nextpage_url(monkeypatch):
         context["__nextpage_url__"]
         == "https://api.github.com/search/code?q=addClass+user%3Amozilla&page=4"
     )
+
+
+def test_handlers_resolve_method_once(monkeypatch):
+    from cloudconnectlib.core import ext
+
+    task = CCEHTTPRequestTask({"url": "https://localhost"}, "test_handlers")
+    task.add_preprocess_handler("set_var", ["{{a}}"], "b")
+    task.add_preprocess_handler("cce_test_late_method", ["{{b}}"], "c")
+    task.add_preprocess_skip_condition("is_true", ["{{skip}}"])
+
+    with pytest.raises(ValueError):
+        task._pre_process({"a": "1"})
+
+    monkeypatch.setitem(
+        ext._extension_functions, "cce_test_late_method", lambda x: x * 2
+    )
+    context = {"a": "1"}
+    task._pre_process(context)
+    assert context == {"a": "1", "b": "1", "c": "11"}
+
+    # Methods are resolved already, lookup is not needed anymore
+    monkeypatch.setattr(ext, "_extension_functions", {})
+    context = {"a": "2", "skip": "false"}
+    task._pre_process(context)
+    assert context["c"] == "22"
+    context = {"a": "3", "skip": "true"}
+    task._pre_process(context)
+    assert "c" not in context
+
+
+def test_stream_response(monkeypatch):
+    sent = []
+
+    def send_internal(self, uri, method, headers=None, body=None):
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(b'{"items": [{"id": 1}, {"id": 2}]}')
+        sent.append(response)
+        return response
+
+    monkeypatch.setattr(HttpClient, "_send_internal", send_internal)
+    task = CCEHTTPRequestTask(
+        {"url": "https://localhost", "method": "GET"}, "test_stream", stream=True
+    )
+    task.add_postprocess_handler(
+        "json_path", ["{{__response__}}", "$.items[*].id"], "ids"
+    )
+    task.set_iteration_count(1)
+    context = {}
+    for _ in task.perform(context):
+        pass
+    assert context["ids"] == [1, 2]
+    assert isinstance(context["__response__"], StreamingHTTPResponse)
+    # Connection is released once the response is processed
+    assert context["__response__"]._closed and len(sent) == 1
+
+
+def test_stream_response_too_large(monkeypatch):
+    def send_internal(self, uri, method, headers=None, body=None):
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(b'{"items": [{"id": 1}, {"id": 2}]}')
+        return response
+
+    monkeypatch.setattr(HttpClient, "_send_internal", send_internal)
+    for max_body_size, expected in ((16, ""), (0, [{"id": 1}, {"id": 2}])):
+        task = CCEHTTPRequestTask(
+            {"url": "https://localhost", "method": "GET"},
+            "test_stream_too_large",
+            stream=True,
+            chunk_size=8,
+            max_body_size=max_body_size,
+        )
+        task.add_postprocess_handler(
+            "json_path", ["{{__response__}}", "$.items"], "items"
+        )
+        task.set_iteration_count(1)
+        context = {}
+        for _ in task.perform(context):
+            pass
+        # A body exceeding the limit is rejected, nothing is extracted
+        assert context["items"] == expected
+
+
+def test_retry_later(monkeypatch):
+    statuses = [503, 503, 200]
+
+    def send_internal(self, uri, method, headers=None, body=None):
+        response = requests.Response()
+        response.status_code = statuses.pop(0)
+        if response.status_code == 503:
+            response.headers["Retry-After"] = "2"
+        response.raw = io.BytesIO(b'{"id": 1}')
+        return response
+
+    monkeypatch.setattr(HttpClient, "_send_internal", send_internal)
+    task = CCEHTTPRequestTask({"url": "https://localhost"}, "test_retry_later")
+    task.add_postprocess_handler("json_path", ["{{__response__}}", "$.id"], "id")
+    task.set_iteration_count(1)
+    context = {}
+    steps = list(task.perform_steps(context))
+    # The task yields instead of sleeping before each retry
+    assert [step.delay for step in steps[:2]] == [2, 2]
+    assert all(isinstance(step, RetryLater) for step in steps[:2])
+    assert steps[2:] == [context] and context["id"] == 1 and not statuses
+
+
+def test_rate_limit(monkeypatch):
+    task = CCEHTTPRequestTask({"url": "https://localhost"}, "test_rate_limit")
+    task.set_rate_limit({"rate": "{{rate}}", "adaptive": True, "key": "{{token}}"})
+    task._prepare_http_client({"rate": "3", "token": "abc"})
+    rate_limit = task._http_client.rate_limit
+    assert rate_limit.rate == 3 and rate_limit.adaptive and rate_limit.key == "abc"
+
+    task = CCEHTTPRequestTask({"url": "https://localhost"}, "test_rate_limit")
+    task._prepare_http_client({})
+    assert task._http_client.rate_limit is None
+
+
+def test_conditional_get(monkeypatch, tmp_path):
+    sent = []
+
+    def send_internal(self, uri, method, headers=None, body=None):
+        sent.append(headers)
+        response = requests.Response()
+        if headers and headers.get("If-None-Match") == '"v1"':
+            response.status_code = 304
+            response.raw = io.BytesIO(b"")
+        else:
+            response.status_code = 200
+            response.headers["ETag"] = '"v1"'
+            response.raw = io.BytesIO(b'{"id": 1}')
+        return response
+
+    monkeypatch.setattr(HttpClient, "_send_internal", send_internal)
+
+    def perform():
+        task = CCEHTTPRequestTask(
+            {"url": "https://localhost/items", "method": "GET"},
+            "test_conditional_get",
+            meta_config={"checkpoint_dir": str(tmp_path)},
+            task_config={"appname": "test", "stanza_name": "test"},
+            conditional_get=True,
+        )
+        task.configure_checkpoint("{{name}}", {"id": "{{id}}"})
+        task.add_postprocess_handler("json_path", ["{{__response__}}", "$.id"], "id")
+        task.set_iteration_count(1)
+        context = {"name": "conditional"}
+        for _ in task.perform(context):
+            pass
+        return context
+
+    assert perform()["id"] == 1
+    # Validators are loaded from checkpoint and the resource is not modified
+    context = perform()
+    assert context["__response__"] is None and len(sent) == 2
+    assert not sent[0] and sent[1]["If-None-Match"] == '"v1"'
+
+
+def test_conditional_get_per_context(monkeypatch, tmp_path):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def send_internal(self, uri, method, headers=None, body=None):
+        # Both contexts are in flight before either response is recorded
+        barrier.wait()
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["ETag"] = '"%s"' % uri.rsplit("/", 1)[-1]
+        response.raw = io.BytesIO(b'{"id": 1}')
+        return response
+
+    monkeypatch.setattr(HttpClient, "_send_internal", send_internal)
+    task = CCEHTTPRequestTask(
+        {"url": "https://localhost/items/{{name}}", "method": "GET"},
+        "test_conditional_get",
+        meta_config={"checkpoint_dir": str(tmp_path)},
+        task_config={"appname": "test", "stanza_name": "test"},
+        conditional_get=True,
+    )
+    task.configure_checkpoint("{{name}}", {"id": "{{id}}"})
+    task.add_postprocess_handler("json_path", ["{{__response__}}", "$.id"], "id")
+    task.set_iteration_count(1)
+
+    def perform(name):
+        for _ in task.perform({"name": name}):
+            pass
+
+    threads = [threading.Thread(target=perform, args=(n,)) for n in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for name in ("a", "b"):
+        validators = task._checkpointer.load_validators({"name": name})
+        assert list(validators) == [f"https://localhost/items/{name}"]
+
+
+def mock_paged_api(monkeypatch, total=50, failed=None, not_modified=None):
+    """Serve items [0, total) by offset or page of 10 items."""
+    state = {"running": 0, "concurrency": 0}
+    lock = threading.Lock()
+
+    def send_internal(self, uri, method, headers=None, body=None):
+        query = {k: int(v[0]) for k, v in parse_qs(urlsplit(uri).query).items()}
+        offset = query.get("offset", (query.get("page", 1) - 1) * 10)
+        with lock:
+            state["running"] += 1
+            state["concurrency"] = max(state["concurrency"], state["running"])
+        time.sleep(0.05)
+        with lock:
+            state["running"] -= 1
+        response = requests.Response()
+        response.status_code = 404 if offset == failed else 200
+        content = {"total": total, "items": list(range(offset, offset + 10))}
+        if offset == not_modified:
+            response.status_code, content = 304, ""
+        response.raw = io.BytesIO(json.dumps(content).encode())
+        return response
+
+    monkeypatch.setattr(HttpClient, "_send_internal", send_internal)
+    return state
+
+
+def paged_task(monkeypatch, url, processed):
+    from cloudconnectlib.core import ext
+
+    monkeypatch.setitem(
+        ext._extension_functions, "cce_test_collect", lambda x: processed.extend(x)
+    )
+    task = CCEHTTPRequestTask({"url": url, "method": "GET"}, "test_pagination")
+    task.add_postprocess_handler("json_path", ["{{__response__}}", "$.total"], "total")
+    task.add_postprocess_handler("json_path", ["{{__response__}}", "$.items"], "items")
+    task.add_postprocess_handler("cce_test_collect", ["{{items}}"])
+    return task
+
+
+def test_pagination(monkeypatch):
+    state = mock_paged_api(monkeypatch)
+    processed = []
+    task = paged_task(monkeypatch, "https://localhost/items?page={{page}}", processed)
+    task.configure_pagination("page", "{{total_pages}}", window=3)
+    task.add_postprocess_handler("set_var", ["5"], "total_pages")
+    context = {}
+    for _ in task.perform(context):
+        pass
+    # Pages are fetched concurrently but processed in order
+    assert processed == list(range(50))
+    assert state["concurrency"] > 1
+    assert context["page"] == 6
+
+    # Resume from offset 20 and stop at the failed page
+    mock_paged_api(monkeypatch, failed=40)
+    processed = []
+    task = paged_task(
+        monkeypatch, "https://localhost/items?offset={{offset}}", processed
+    )
+    task.configure_pagination("offset", "{{total}}", "offset", page_size=10)
+    context = {"offset": "20"}
+    for _ in task.perform(context):
+        pass
+    assert processed == list(range(20, 40))
+    assert context["offset"] == 40
+
+    # A page not modified is skipped instead of ending the task
+    mock_paged_api(monkeypatch, not_modified=20)
+    processed = []
+    task = paged_task(monkeypatch, "https://localhost/items?page={{page}}", processed)
+    task.configure_pagination("page", "{{total_pages}}", window=2)
+    task.add_postprocess_handler("set_var", ["5"], "total_pages")
+    context = {}
+    for _ in task.perform(context):
+        pass
+    assert processed == list(range(20)) + list(range(30, 50))
+    assert context["page"] == 6
+
+    with pytest.raises(ValueError):
+        task.configure_pagination("offset", "{{total}}", "offset")
+    with pytest.raises(ValueError):
+        task.configure_pagination("page", "{{total}}", "cursor")
+
+
+def test_pagination_async(monkeypatch):
+    mock_paged_api(monkeypatch, total=35)
+    processed = []
+    task = paged_task(monkeypatch, "https://localhost/items?page={{page}}", processed)
+    task.configure_pagination("page", 4, window=2)
+    task.set_iteration_count(3)
+    loop = asyncio.new_event_loop()
+    try:
+        context = loop.run_until_complete(task.perform_async({}))[0]
+    finally:
+        loop.close()
+    assert processed == list(range(30))
+    assert context["page"] == 4
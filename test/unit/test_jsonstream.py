@@ -0,0 +1,143 @@
+#
+# Copyright 2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import io
+import json
+
+import pytest
+from jsonpath_ng import parse
+
+from cloudconnectlib.core.ext import json_path
+from cloudconnectlib.core.jsonstream import (
+    _Reader,
+    iter_json_path,
+    iter_json_records,
+    parse_streamable_path,
+)
+
+
+def test_parse_streamable_path():
+    assert parse_streamable_path("$") == ((), False)
+    assert parse_streamable_path("$[*]") == ((), True)
+    assert parse_streamable_path("$.items[*]") == (("items",), True)
+    assert parse_streamable_path("data.items[*]") == (("data", "items"), True)
+    assert parse_streamable_path("$.next") == (("next",), False)
+    for expr in ("$..id", "$.items[0]", "$.items[*].id", "$[?(@.a)]", None):
+        assert parse_streamable_path(expr) is None
+
+
+def _find_or_error(find):
+    try:
+        return find()
+    except TypeError:
+        return TypeError
+
+
+def test_iter_json_path():
+    docs = [
+        {
+            "meta": {"x": 'a]}"b', "y": [1, {"z": "\\"}]},
+            "items": [{"id": 1, "s": 'é漢字\\"'}, 2.5e3, -1234567890, None, "s"],
+        },
+        [1, 2, {"a": "}"}],
+        {"items": {"a": 1}},
+        {"items": None},
+        {"items": 0},
+        {"items": ""},
+        {"items": {}},
+        {"items": 1.5},
+        {"items": True},
+        {"items": False},
+        {"items": [0, "", False, 0.0, None]},
+        {"other": 1},
+        {"data": {"items": [1, 2]}, "next": "abc"},
+    ]
+    exprs = ["$.items[*]", "$[*]", "$", "$.data.items[*]", "$.next"]
+    for doc in docs:
+        raw = json.dumps(doc, ensure_ascii=False).encode("utf-8")
+        for expr in exprs:
+            # The result is the same as the installed jsonpath_ng, including
+            # the error raised for values it can't match, e.g. float.
+            expected = _find_or_error(
+                lambda: [match.value for match in parse(expr).find(doc)]
+            )
+            sources = [
+                [raw[i : i + size] for i in range(0, len(raw), size)]
+                for size in (1, 3, 1024)
+            ]
+            sources += [io.BytesIO(raw), raw.decode("utf-8")]
+            for source in sources:
+                actual = _find_or_error(lambda: list(iter_json_path(source, expr)))
+                assert actual == expected
+
+
+def test_iter_json_records():
+    docs = [
+        {"items": [0, "", False, None, {"id": 1}]},
+        {"items": {"id": 1}},
+        {"items": "s"},
+        {"items": 0},
+        {"items": ""},
+        {"items": False},
+        {"items": None},
+        {"items": {}},
+        {"items": []},
+        {"items": [0]},
+        {"other": 1},
+    ]
+    for doc in docs:
+        raw = json.dumps(doc)
+        # Records are the same as the value `json_path` extracts, an array is
+        # expanded and an empty value is dropped
+        expected = json_path(raw, "$.items")
+        if not isinstance(expected, list):
+            expected = [expected] if expected != "" else []
+        assert list(iter_json_records(raw, "$.items")) == expected
+        assert list(iter_json_records([raw[:5], raw[5:]], "items")) == expected
+
+    with pytest.raises(ValueError):
+        list(iter_json_records("{}", "$.items[*]"))
+
+
+def test_iter_json_path_invalid():
+    with pytest.raises(ValueError):
+        list(iter_json_path("{}", "$..id"))
+
+    values = iter_json_path('{"items": [1, 2, ', "$.items[*]")
+    assert next(values) == 1
+    assert next(values) == 2
+    with pytest.raises(ValueError):
+        next(values)
+
+
+def test_iter_json_path_large_value():
+    buffered = []
+
+    def chunks(key):
+        yield b'{"%s": "' % key
+        for _ in range(1000):
+            buffered.append(len(reader._buffer))
+            yield b"\\\\" + b"x" * 4094
+        yield b'", "next": "abc"}'
+
+    # Skipped value is dropped from buffer as it's scanned
+    reader = _Reader(chunks(b"skip"), "utf-8")
+    assert reader.locate(("next",))
+    assert reader.read_value() == "abc"
+    assert max(buffered) <= 4096
+
+    reader = _Reader(chunks(b"data"), "utf-8")
+    assert reader.locate(("data",))
+    assert reader.read_value() == ("\\" + "x" * 4094) * 1000
@@ -123,6 +123,23 @@ def test_load_global_setting():
     assert setting.proxy.port == "1"
     assert setting.proxy.username == "admin"
     assert setting.proxy.password == "changeme"
+    assert setting.rate_limit is None
+
+    setting_with_rate_limit = {
+        "rate_limit": {"rate": "{{rate}}", "adaptive": "true", "key": "{{token}}"}
+    }
+    setting = loader._load_global_setting(
+        setting_with_rate_limit, {"rate": " 5 ", "token": "abc"}
+    )
+    assert setting.rate_limit.rate == 5
+    assert setting.rate_limit.burst == 1
+    assert setting.rate_limit.adaptive
+    assert setting.rate_limit.get_key("https://host/path") == "abc"
+
+    with pytest.raises(ValueError):
+        loader._load_global_setting({"rate_limit": {"rate": "fast"}}, {})
+    with pytest.raises(ValueError):
+        loader._load_global_setting({"rate_limit": {"rate": "0"}}, {})
 
 
 def test_load_config():
@@ -18,6 +18,7 @@ import base64
 import pytest
 from jinja2 import TemplateSyntaxError
 
+from cloudconnectlib.core.context import Context
 from cloudconnectlib.core.models import (
     BasicAuthorization,
     Condition,
@@ -27,6 +28,57 @@ from cloudconnectlib.core.models import (
 )
 
 
+def test_token_render_memoized():
+    token = _Token("{{ base }}/api?page={{ page }}")
+    calls = []
+    render = token._value_for
+    token._value_for = lambda ctx: calls.append(1) or render(ctx)
+
+    data = {"base": "https://host", "page": 1, "other": "x"}
+    ctx = Context(data)
+    assert token.render(ctx) == "https://host/api?page=1"
+    ctx["other"] = "y"
+    assert token.render(ctx) == "https://host/api?page=1"
+    assert len(calls) == 1
+
+    ctx["page"] = 2
+    assert token.render(ctx) == "https://host/api?page=2"
+    assert len(calls) == 2
+    assert data["page"] == 2
+
+    # A different context never reuses the rendered value
+    assert token.render(Context(dict(data))) == "https://host/api?page=2"
+    assert len(calls) == 3
+
+    # Plain dict context is always rendered
+    token.render(data)
+    token.render(data)
+    assert len(calls) == 5
+
+    volatile = _Token("{{ [1, 2, 3] | random }}")
+    assert volatile._variables is None
+
+
+def test_token_render_mutable_variables():
+    ctx = Context({"items": [1], "meta": {"page": 1}})
+    token = _Token("count={{ items | length }}")
+    assert token.render(ctx) == "count=1"
+    # Changes in place don't change the stamp, the value is rendered again
+    ctx["items"].append(2)
+    assert token.render(ctx) == "count=2"
+
+    token = _Token("page={{ meta.page }}")
+    assert token.render(ctx) == "page=1"
+    ctx["meta"]["page"] = 2
+    assert token.render(ctx) == "page=2"
+
+
+def test_native_token_render():
+    ctx = {"data": {"items": [1, 2, 3]}}
+    assert _Token("{{ data['items'][1:] }}").render(ctx) == "[2, 3]"
+    assert _Token("{{ data['items'][1:] }}", native=True).render(ctx) == [2, 3]
+
+
 def test_token_render():
     int_token = _Token(123)
     ctx = {}
@@ -68,3 +68,50 @@ def test_split_task_for_empty_string():
     results = splittask.perform(context)
     with pytest.raises(CCESplitError):
         results = list(results)
+
+
+def test_split_task_shares_context():
+    splittask = CCESplitTask("test_split_task_shares_context")
+    splittask.configure_split("split_by", "{{apps}}", "app")
+    context = {"apps": ["app1", "app2"], "body": {"items": [1, 2, 3]}}
+    results = list(splittask.perform(context))
+    assert [r["app"] for r in results] == ["app1", "app2"]
+    # Values are shared until they are isolated
+    assert all("body" not in r._data for r in results)
+    assert results[0]["body"] is results[1]["body"]
+
+    results[0].isolate("body")["items"].append(4)
+    assert results[0]["body"] == {"items": [1, 2, 3, 4]}
+    assert results[1]["body"] == context["body"] == {"items": [1, 2, 3]}
+    assert "app" not in context
+
+
+def test_split_task_in_batches():
+    splittask = CCESplitTask("test_split_task_in_batches")
+    splittask.configure_split("split_by", "{{apps}}", "app", batch_size=2)
+    context = {"apps": ["app1", "app2", "app3"]}
+    results = list(splittask.perform(context))
+    assert [r["app"] for r in results] == [["app1", "app2"], ["app3"]]
+
+    with pytest.raises(ValueError):
+        splittask.configure_split("split_by", "{{apps}}", "app", batch_size=0)
+
+
+def test_split_task_is_lazy():
+    pulled = []
+
+    def apps():
+        for i in range(50000):
+            pulled.append(i)
+            yield f"app{i}"
+
+    splittask = CCESplitTask("test_split_task_is_lazy")
+    splittask.configure_split("split_by", "{{apps}}", "app")
+    results = splittask.perform({"apps": apps()})
+    assert next(results)["app"] == "app0"
+    assert next(results)["app"] == "app1"
+    assert len(pulled) == 2
+
+    splittask.configure_split("split_by", "{{apps}}", "app")
+    with pytest.raises(CCESplitError):
+        list(splittask.perform({"apps": iter(())}))
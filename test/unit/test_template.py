@@ -13,10 +13,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import os
+
 import pytest
 from jinja2 import TemplateSyntaxError
+from jinja2.exceptions import UndefinedError
 
-from cloudconnectlib.core.template import compile_template
+from cloudconnectlib.core.models import DictToken, _Token
+from cloudconnectlib.core.template import (
+    BYTECODE_CACHE_FOLDER,
+    clear_template_cache,
+    compile_template,
+    set_bytecode_cache_dir,
+    template_cache_info,
+)
 
 
 def test_compile_template():
@@ -56,3 +66,90 @@ def test_compile_template():
 
         ctx = {}
         assert func(ctx) == ""
+
+
+def test_compiled_template_cache():
+    clear_template_cache()
+    _Token("{{__response__.body}}")
+    DictToken({"body": "{{__response__.body}}", "key": "{{api_key}}"})
+    info = template_cache_info()
+    assert info.misses == 2
+    assert info.hits == 1
+    assert info.currsize == 2
+
+    token = _Token("{{__response__.body}}")
+    assert token.render({"__response__": {"body": "abc"}}) == "abc"
+    assert template_cache_info().hits == 2
+
+    clear_template_cache()
+    assert template_cache_info().currsize == 0
+
+
+def test_compile_template_fast_path():
+    assert compile_template("abc")({}) == "abc"
+    assert compile_template("abc\n")({}) == "abc"
+    # Newlines are normalized the same as Jinja2
+    assert compile_template("a\r\nb\rc")({}) == "a\nb\nc"
+    assert compile_template("abc\r")({}) == "abc"
+
+    func = compile_template("{{ __response__.headers.link }}")
+    ctx = {"__response__": {"headers": {"link": "https://next"}}}
+    assert func(ctx) == "https://next"
+    assert func({"__response__": {"headers": {}}}) == ""
+    assert func({"__response__": {"headers": {"link": None}}}) == "None"
+    with pytest.raises(UndefinedError):
+        func({})
+    with pytest.raises(UndefinedError):
+        func({"__response__": {}})
+
+    class Response:
+        body = {"items": [1, 2]}
+
+    # Dotted paths are rendered to strings the same as Jinja2
+    func = compile_template("{{__response__.body}}")
+    assert func({"__response__": Response()}) == "{'items': [1, 2]}"
+    assert func({"__response__": {"body": 0}}) == "0"
+    assert func({"__response__": {"body": 200}}) == "200"
+    assert func({"__response__": {"body": True}}) == "True"
+    assert compile_template("{{__response__.body}}", True)(
+        {"__response__": {"body": [1]}}
+    ) == [1]
+
+    func = compile_template("{{a.b}}-{{c}}")
+    assert func({"a": {"b": 1}, "c": 2}) == "1-2"
+
+
+def test_bytecode_cache(tmp_path):
+    from cloudconnectlib import __version__
+
+    set_bytecode_cache_dir(str(tmp_path))
+    try:
+        clear_template_cache()
+        assert compile_template("{{ a | upper }}")({"a": "x"}) == "X"
+        cache_dir = tmp_path / BYTECODE_CACHE_FOLDER / __version__
+        assert len(os.listdir(str(cache_dir))) == 1
+
+        clear_template_cache()
+        assert compile_template("{{ a | upper }}")({"a": "y"}) == "Y"
+        assert len(os.listdir(str(cache_dir))) == 1
+
+        # A corrupt cache file is compiled again and replaced
+        (cache_file,) = cache_dir.iterdir()
+        content = cache_file.read_bytes()
+        cache_file.write_bytes(content[: len(content) // 2])
+        clear_template_cache()
+        assert compile_template("{{ a | upper }}")({"a": "z"}) == "Z"
+        assert os.listdir(str(cache_dir)) == [cache_file.name]
+        assert cache_file.read_bytes() == content
+    finally:
+        set_bytecode_cache_dir(None)
+        clear_template_cache()
+
+
+def test_compile_native_template():
+    ctx = {"items": [{"id": 1}, {"id": 2}], "a": [1], "b": [2]}
+    assert compile_template("{{ items | first }}")(ctx) == "{'id': 1}"
+    assert compile_template("{{ items | first }}", True)(ctx) == {"id": 1}
+    assert compile_template("{{ a + b }}", True)(ctx) == [1, 2]
+    assert compile_template("{{ items[1].id }}", True)(ctx) == 2
+    assert compile_template("$.items[*]", True)(ctx) == "$.items[*]"
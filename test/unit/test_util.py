@@ -13,7 +13,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
-from cloudconnectlib.common.util import is_true, is_valid_bool, is_valid_port
+import pytest
+from solnlib.modular_input.event import EventException, XMLEvent
+
+from cloudconnectlib.common.util import (
+    format_events,
+    is_true,
+    is_valid_bool,
+    is_valid_port,
+)
 
 
 def test_is_true():
@@ -84,3 +92,34 @@ def test_is_valid_port():
     assert all(is_valid_port(p) for p in good_ports)
     bad_ports = [0, "0", -1, "-1", 65536, "65536", "1234567", "$%^&", "=="]
     assert all(not is_valid_port(p) for p in bad_ports)
+
+
+def test_format_events():
+    raw_events = [
+        "plain",
+        "",
+        "a & b <c> ]]> d",
+        "é漢字 \ud800 \x01\n\r\t",
+        {"k": [1, 2, "<&>"]},
+        None,
+        0,
+    ]
+    headers = [
+        {},
+        {"time": 1459919070.9945, "index": "main", "host": "h&<>"},
+        {"time": 0.0, "index": "", "source": "é", "sourcetype": "st"},
+        {"unbroken": True},
+        {"unbroken": True, "done": True, "time": 12},
+        {"stanza": 'input://a"b\n'},
+    ]
+    for header in headers:
+        for events in (raw_events, raw_events[:1], []):
+            expected = XMLEvent.format_events(
+                XMLEvent(data, **header) for data in events
+            )
+            assert format_events(events, **header) == expected
+    assert format_events(iter(raw_events)) == format_events(raw_events)
+    with pytest.raises(TypeError):
+        format_events(["a"], host=123)
+    with pytest.raises(EventException):
+        format_events(["a"], done=True)